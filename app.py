@@ -1,5 +1,6 @@
 """UDocker Web Manager - Hlavní soubor"""
 
+import os
 import sys
 from pathlib import Path
 
@@ -7,15 +8,38 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from flask import Flask
 from lib.config_manager import ConfigManager
+from lib.sqlite_config_manager import SQLiteConfigManager
 from lib.udocker_wrapper import UDockerWrapper
 from lib.container_manager import ContainerManager
+from lib.pull_jobs import PullJobQueue
+from lib.startup import StartupTask
+from lib.state_events import StateEvents
+from lib.page_renderer import PageRenderer
+from lib.assets import StaticAssets
 
-app = Flask(__name__)
+# Statické soubory servíruje /static/<hash> z routes.py (dlouhodobá cache, předkomprimované varianty)
+app = Flask(__name__, static_folder=None)
+assets = StaticAssets(Path(__file__).parent / 'static')
+app.jinja_env.globals['asset_url'] = assets.url
+
+# Více procesů (gunicorn.conf.py) - sdílená cache stavu a autostart jen v jednom workeru
+shared_state = os.environ.get('UDOCKER_MANAGER_SHARED_STATE') == '1'
 
 # Inicializace managerů
 config_manager = ConfigManager()
-udocker = UDockerWrapper()
-container_manager = ContainerManager(config_manager, udocker)
+if config_manager.get_setting('config_store', 'yaml') == 'sqlite':
+    config_manager = SQLiteConfigManager()
+udocker = UDockerWrapper(read_backend=config_manager.get_setting('read_backend', 'files'),
+                         engine=config_manager.get_setting('engine', 'subprocess'),
+                         log_dir=config_manager.config_dir / 'logs',
+                         shared_cache_dir=config_manager.config_dir / 'cache' if shared_state else None,
+                         image_index_path=config_manager.config_dir / 'image_refs.json')
+pull_jobs = PullJobQueue(udocker, workers=config_manager.get_setting('pull_workers', 2))
+container_manager = ContainerManager(config_manager, udocker, pull_jobs)
+state_events = StateEvents(container_manager, interval=config_manager.get_setting('events_interval', 2.0))
+page_renderer = PageRenderer(app.jinja_env)
+startup = StartupTask(container_manager, autostart_workers=config_manager.get_setting('autostart_workers', 4),
+                      status_dir=config_manager.config_dir if shared_state else None)
 
 # Import routes
 from routes import *
@@ -30,16 +54,9 @@ if __name__ == '__main__':
         sys.exit(1)
     
     print(f"\n✓ Konfigurace: {config_manager.config_file}")
-    print("\n🔄 Synchronizuji kontejnery...")
-    container_manager.sync_running_containers()
     
-    print("\n🚀 Autostart kontejnery...")
-    results = container_manager.autostart_all()
-    if results:
-        for name, (success, msg) in results.items():
-            print(f"  {'✓' if success else '✗'} {name}")
-    else:
-        print("  (žádné)")
+    # Synchronizace a autostart běží na pozadí - server přijímá požadavky hned, stav na /ready
+    startup.start()
     
     print("\n" + "=" * 70)
     print("🌐 Server: http://localhost:5000")
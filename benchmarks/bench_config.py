@@ -0,0 +1,76 @@
+"""Mikro-benchmark načítání/ukládání konfigurace (10, 100 a 1000 kontejnerů)
+
+Spuštění: python benchmarks/bench_config.py
+"""
+
+import sys
+import time
+import pickle
+import tempfile
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.config_manager import ConfigManager, YamlLoader, YamlDumper
+
+def make_config(count: int) -> dict:
+    containers = {}
+    for i in range(count):
+        containers[f"container-{i}"] = {
+            'name': f"container-{i}",
+            'image': f"registry.example.com/team/app-{i % 17}:1.{i % 5}",
+            'autostart': i % 3 == 0,
+            'ports': [f"{8000 + i}:80", f"{9000 + i}:443"],
+            'volumes': [f"/srv/data/{i}:/data", f"/srv/logs/{i}:/var/log/app"],
+            'env': [f"APP_ID={i}", 'LOG_LEVEL=info', 'TZ=Europe/Prague'],
+            'command': '/usr/bin/app --serve'
+        }
+    return {'version': '1.0', 'containers': containers}
+
+def bench(fn, min_time: float = 0.2) -> float:
+    """Vrátí průměrnou dobu jednoho volání v ms"""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed * 1000 / runs
+
+def main():
+    dump_args = dict(default_flow_style=False, allow_unicode=True, sort_keys=False, indent=2)
+    print(f"Loader: {YamlLoader.__name__}, Dumper: {YamlDumper.__name__}\n")
+    print(f"{'kontejnerů':>10} | {'safe_load':>10} | {'C loader':>10} | {'snapshot':>10} | "
+          f"{'dump':>10} | {'C dumper':>10} | {'ConfigManager':>13}")
+    print('-' * 90)
+    
+    for count in (10, 100, 1000):
+        config = make_config(count)
+        text = yaml.dump(config, **dump_args)
+        blob = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = ConfigManager(Path(tmp), write_delay=0)
+            manager.save_config(config)
+            
+            def cold_load():
+                # Nová instance = start aplikace (načtení přes snapshot)
+                ConfigManager(Path(tmp)).get_all_containers()
+            
+            results = [
+                bench(lambda: yaml.safe_load(text)),
+                bench(lambda: yaml.load(text, Loader=YamlLoader)),
+                bench(lambda: pickle.loads(blob)),
+                bench(lambda: yaml.dump(config, **dump_args)),
+                bench(lambda: yaml.dump(config, Dumper=YamlDumper, **dump_args)),
+                bench(cold_load),
+            ]
+        
+        print(f"{count:>10} | " + ' | '.join(f"{r:>8.3f}ms" for r in results[:5])
+              + f" | {results[5]:>11.3f}ms")
+
+if __name__ == '__main__':
+    main()
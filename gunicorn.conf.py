@@ -0,0 +1,34 @@
+"""Produkční konfigurace serveru (gunicorn, gthread)
+
+Spuštění z adresáře projektu:
+
+    gunicorn app:app
+
+Všechny workery sdílí cache stavu udockeru (~/.udocker_manager/cache) a synchronizaci
+s autostartem po startu provede jen jeden z nich. Hodnoty lze přepsat proměnnými
+prostředí UDOCKER_MANAGER_BIND, UDOCKER_MANAGER_WORKERS a UDOCKER_MANAGER_THREADS.
+"""
+
+import os
+
+bind = os.environ.get('UDOCKER_MANAGER_BIND', '0.0.0.0:5000')
+worker_class = 'gthread'
+workers = int(os.environ.get('UDOCKER_MANAGER_WORKERS', 2))
+# Každé otevřené SSE spojení (/events, sledování logů, průběh stahování) drží jedno vlákno
+threads = int(os.environ.get('UDOCKER_MANAGER_THREADS', 16))
+# gthread hlídá workery heartbeatem, dlouhé SSE požadavky timeout nespouští
+timeout = 60
+graceful_timeout = 15
+keepalive = 5
+
+# Aplikace se načítá až ve workerech - vlákna a zámky se nesmí zdědit přes fork
+preload_app = False
+raw_env = ['UDOCKER_MANAGER_SHARED_STATE=1']
+
+accesslog = '-'
+errorlog = '-'
+
+def post_worker_init(worker):
+    """Synchronizace a autostart jen v jednom workeru (skupina = PID master procesu)"""
+    from app import startup
+    startup.start_once(str(worker.ppid))
@@ -0,0 +1,85 @@
+"""Statické soubory s hashem v názvu a komprese odpovědí (gzip, brotli)"""
+
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+# Brotli je volitelný - bez něj se používá jen gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIME_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+}
+
+# Typy odpovědí, které se komprimují za běhu
+COMPRESSIBLE_TYPES = {'text/html', 'application/json', 'text/css', 'application/javascript'}
+
+class StaticAsset:
+    """Jeden statický soubor s předkomprimovanými variantami"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = path.read_bytes()
+        self.digest = hashlib.blake2b(self.data, digest_size=8).hexdigest()
+        self.mimetype = MIME_TYPES.get(path.suffix, 'application/octet-stream')
+        self.hashed_name = f"{path.stem}.{self.digest}{path.suffix}"
+        self.variants: Dict[str, bytes] = {'gzip': gzip.compress(self.data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(self.data, quality=11)
+
+class StaticAssets:
+    """Statické soubory načtené při startu - URL obsahuje hash obsahu, takže je lze cachovat navždy"""
+    
+    def __init__(self, static_dir: Path):
+        self.static_dir = Path(static_dir)
+        self._by_name: Dict[str, StaticAsset] = {}
+        self._by_hashed: Dict[str, StaticAsset] = {}
+        for path in sorted(self.static_dir.iterdir()):
+            if path.is_file() and path.suffix in MIME_TYPES:
+                asset = StaticAsset(path)
+                self._by_name[path.name] = asset
+                self._by_hashed[asset.hashed_name] = asset
+    
+    def url(self, name: str) -> str:
+        """URL souboru s hashem obsahu (pro šablonu)"""
+        return f"/static/{self._by_name[name].hashed_name}"
+    
+    def get(self, hashed_name: str) -> Optional[StaticAsset]:
+        return self._by_hashed.get(hashed_name)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                'url': self.url(name),
+                'size': len(asset.data),
+                **{encoding: len(data) for encoding, data in asset.variants.items()}
+            }
+            for name, asset in self._by_name.items()
+        }
+
+def choose_encoding(accept_encoding: str, available) -> Optional[str]:
+    """Vybere nejlepší kódování podporované klientem (br před gzip)"""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(token.strip().lower())
+    for encoding in ('br', 'gzip'):
+        if encoding in accepted and encoding in available:
+            return encoding
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Komprese za běhu - nižší úroveň, rychlost je důležitější než poslední procenta"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+def dynamic_encodings() -> Tuple[str, ...]:
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
@@ -0,0 +1,151 @@
+"""Paralelní autostart kontejnerů s respektováním závislostí (depends_on)"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Tuple
+
+def resolve_dependencies(containers: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """Převede depends_on (ID nebo názvy kontejnerů) na graf závislostí mezi spouštěnými kontejnery
+    
+    Vrací (container_id -> seznam ID závislostí, container_id -> chyba). Závislosti na kontejnerech,
+    které se nespouští automaticky, se ignorují. Kontejnery v cyklu dostanou chybu.
+    """
+    by_name = {config.get('name', container_id): container_id for container_id, config in containers.items()}
+    graph: Dict[str, List[str]] = {}
+    errors: Dict[str, str] = {}
+    
+    for container_id, config in containers.items():
+        depends_on = config.get('depends_on') or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        
+        deps = []
+        for dep in depends_on:
+            dep_id = dep if dep in containers else by_name.get(dep)
+            if dep_id is None:
+                print(f"  • {container_id}: závislost {dep} se nespouští automaticky, ignoruji")
+            elif dep_id != container_id and dep_id not in deps:
+                deps.append(dep_id)
+        graph[container_id] = deps
+    
+    # Kahnův algoritmus - co zbude, je v cyklu (nebo na cyklu závisí)
+    indegree = {container_id: len(deps) for container_id, deps in graph.items()}
+    dependents: Dict[str, List[str]] = {container_id: [] for container_id in graph}
+    for container_id, deps in graph.items():
+        for dep_id in deps:
+            dependents[dep_id].append(container_id)
+    
+    queue = [container_id for container_id, count in indegree.items() if count == 0]
+    while queue:
+        container_id = queue.pop()
+        for dependent in dependents[container_id]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                queue.append(dependent)
+    
+    for container_id, count in indegree.items():
+        if count > 0:
+            errors[container_id] = "Cyklická závislost v depends_on"
+    return graph, errors
+
+class AutostartRunner:
+    """Spouští kontejnery v omezeném poolu workerů - nezávislé souběžně, závislé až po svých závislostech"""
+    
+    def __init__(self, start: Callable[[str], Tuple[bool, str]], workers: int = 4,
+                 on_progress: Callable[[], None] = None):
+        self.start = start
+        self.on_progress = on_progress
+        self.workers = max(1, workers)
+        self.report: Dict[str, Dict[str, Any]] = {}
+        self.total = 0
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+    
+    def _record(self, container_id: str, name: str, success: bool, message: str,
+                queued: float, started: float = None):
+        now = time.monotonic()
+        with self._lock:
+            self.report[container_id] = {
+                'name': name,
+                'success': success,
+                'message': message,
+                'waited': round((started or now) - queued, 3),  # čekání na závislosti a volného workera
+                'duration': round(now - started, 3) if started is not None else 0.0
+            }
+        if self.on_progress is not None:
+            self.on_progress()
+    
+    def _start_one(self, container_id: str, name: str, queued: float) -> bool:
+        started = time.monotonic()
+        try:
+            success, message = self.start(container_id)
+        except Exception as e:
+            success, message = False, f"Chyba při spuštění: {e}"
+        self._record(container_id, name, success, message, queued, started)
+        return success
+    
+    def run(self, containers: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Spustí všechny kontejnery a vrátí report (container_id -> výsledek a časy)"""
+        self.started = time.monotonic()
+        self.total = len(containers)
+        graph, errors = resolve_dependencies(containers)
+        names = {container_id: config.get('name', container_id) for container_id, config in containers.items()}
+        
+        for container_id, message in errors.items():
+            self._record(container_id, names[container_id], False, message, self.started)
+        
+        remaining = {container_id: set(deps) for container_id, deps in graph.items() if container_id not in errors}
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='autostart') as pool:
+            while remaining or running:
+                # Spustit vše, co už nemá nesplněné závislosti
+                for container_id in [c for c, deps in remaining.items() if not deps]:
+                    del remaining[container_id]
+                    future = pool.submit(self._start_one, container_id, names[container_id], self.started)
+                    running[future] = container_id
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    container_id = running.pop(future)
+                    success = future.result()
+                    failed = [] if success else [container_id]
+                    
+                    # Závislé na neúspěšném kontejneru se nespouští (a ani ty, co závisí na nich)
+                    while failed:
+                        failed_id = failed.pop()
+                        for dependent, deps in list(remaining.items()):
+                            if failed_id in deps:
+                                del remaining[dependent]
+                                self._record(dependent, names[dependent], False,
+                                             f"Nespuštěno - závislost {names[failed_id]} selhala", self.started)
+                                failed.append(dependent)
+                    
+                    for deps in remaining.values():
+                        deps.discard(container_id)
+        
+        self.finished = time.monotonic()
+        return {container_id: self.report[container_id] for container_id in containers}
+    
+    def progress(self) -> Dict[str, Any]:
+        """Průběžný stav autostartu (lze volat z jiného vlákna během run)"""
+        with self._lock:
+            report = dict(self.report)
+        return {
+            'total': self.total,
+            'done': len(report),
+            'failed': sum(1 for entry in report.values() if not entry['success']),
+            'elapsed': self.elapsed,
+            'containers': report
+        }
+    
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return round((self.finished or time.monotonic()) - self.started, 3)
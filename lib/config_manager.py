@@ -1,18 +1,56 @@
 """Správa konfigurace v YAML formátu"""
 
+import os
+import copy
+import pickle
+import hashlib
+import atexit
+import weakref
+import threading
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from lib.fileutil import file_lock, write_atomic
+
+# Rychlý C parser/dumper z libyaml, pokud je PyYAML s ním sestaven
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+SNAPSHOT_VERSION = 1
+
+# Živé instance - čekající změny se zapíšou při ukončení procesu (slabé reference,
+# instance tím nezůstává naživu; instanci s naplánovaným zápisem drží její časovač)
+_instances: 'weakref.WeakSet[ConfigManager]' = weakref.WeakSet()
+
+@atexit.register
+def _flush_all():
+    for manager in list(_instances):
+        manager.flush()
 
 class ConfigManager:
-    def __init__(self, config_dir: Path = None):
+    def __init__(self, config_dir: Path = None, write_delay: float = 0.1):
         if config_dir is None:
             config_dir = Path.home() / '.udocker_manager'
         
         self.config_dir = Path(config_dir)
         self.config_file = self.config_dir / 'config.yaml'
+        self.lock_file = self.config_dir / '.config.lock'
+        self.snapshot_file = self.config_dir / '.config.snapshot'
         self.config_dir.mkdir(exist_ok=True)
         
+        # Naparsovaná konfigurace a podpis souboru (mtime, velikost, inode), ze kterého vznikla
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_signature: Optional[Tuple[int, int, int]] = None
+        self._cache_lock = threading.RLock()
+        
+        # Změny kontejnerů čekající na zápis (container_id -> konfigurace, None = smazání)
+        self.write_delay = write_delay
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        _instances.add(self)
+        
         if not self.config_file.exists():
             self._create_default_config()
     
@@ -20,14 +58,29 @@ class ConfigManager:
         """Vytvoří výchozí konfigurační soubor."""
         self.save_config({'version': '1.0', 'containers': {}})
     
-    def load_config(self) -> Dict[str, Any]:
-        """Načte celou konfiguraci ze souboru."""
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        """Vrátí (mtime, velikost, inode) konfiguračního souboru, nebo None pokud neexistuje"""
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def _parse_config(self) -> Dict[str, Any]:
+        """Načte a naparsuje konfigurační soubor (přes binární snapshot, pokud odpovídá obsahu)"""
         try:
             if not self.config_file.exists():
                 return {'version': '1.0', 'containers': {}}
             
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            with open(self.config_file, 'rb') as f:
+                raw = f.read()
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+            
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            config = self._load_snapshot(digest, mtime)
+            if config is None:
+                config = yaml.load(raw.decode('utf-8'), Loader=YamlLoader)
+                self._save_snapshot(config, digest, mtime)
                 
             # Ošetření pro prázdný soubor nebo poškozenou strukturu
             if not config or not isinstance(config, dict):
@@ -41,43 +94,146 @@ class ConfigManager:
             print(f"Chyba při načítání konfigurace: {e}")
             return {'version': '1.0', 'containers': {}}
     
+    def _load_snapshot(self, digest: str, mtime: int) -> Optional[Any]:
+        """Vrátí konfiguraci z binárního snapshotu, pokud vznikl ze stejného obsahu a mtime YAML"""
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception:
+            return None
+        
+        if (not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION
+                or snapshot.get('digest') != digest or snapshot.get('mtime') != mtime):
+            return None
+        return snapshot.get('config')
+    
+    def _save_snapshot(self, config: Any, digest: str, mtime: int):
+        """Uloží naparsovanou konfiguraci jako pickle snapshot (jen zrychlení - chyby se ignorují)"""
+        data = {'version': SNAPSHOT_VERSION, 'digest': digest, 'mtime': mtime, 'config': config}
+        try:
+            write_atomic(self.snapshot_file, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            print(f"Nelze uložit snapshot konfigurace: {e}")
+    
+    def _cached_config(self) -> Dict[str, Any]:
+        """Vrátí sdílenou naparsovanou konfiguraci - soubor se parsuje jen když se změnil
+
+        Vrácený slovník se nesmí měnit; veřejné metody vrací kopie.
+        """
+        with self._cache_lock:
+            signature = self._file_signature()
+            if self._cache is None or signature != self._cache_signature:
+                self._cache = self._parse_config()
+                self._cache_signature = signature
+                # Soubor změnil jiný proces - neuložené změny aplikovat znovu
+                self._apply_pending(self._cache)
+            return self._cache
+    
+    def _apply_pending(self, config: Dict[str, Any]):
+        """Aplikuje čekající změny kontejnerů na konfiguraci"""
+        containers = config.setdefault('containers', {})
+        for container_id, container_config in self._pending.items():
+            if container_config is None:
+                containers.pop(container_id, None)
+            else:
+                containers[container_id] = copy.deepcopy(container_config)
+    
+    def _file_lock(self):
+        """Exkluzivní zámek konfigurace sdílený mezi procesy (fcntl)"""
+        return file_lock(self.lock_file)
+    
+    def _write_atomic(self, config: Dict[str, Any]):
+        """Zapíše konfiguraci do dočasného souboru, fsync a os.replace - soubor nikdy není useknutý"""
+        raw = yaml.dump(config, Dumper=YamlDumper, default_flow_style=False, 
+                        allow_unicode=True, sort_keys=False, indent=2).encode('utf-8')
+        mtime = write_atomic(self.config_file, raw, durable=True)
+        
+        # Snapshot rovnou k zapsanému obsahu - další start nemusí parsovat YAML
+        self._save_snapshot(copy.deepcopy(config), hashlib.blake2b(raw, digest_size=16).hexdigest(), mtime)
+    
+    def load_config(self) -> Dict[str, Any]:
+        """Načte celou konfiguraci (kopie z paměti, ze souboru jen po jeho změně)."""
+        return copy.deepcopy(self._cached_config())
+    
     def save_config(self, config: Dict[str, Any]):
         """Uloží celou konfiguraci do souboru."""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(config, f, default_flow_style=False, 
-                         allow_unicode=True, sort_keys=False, indent=2)
+            with self._cache_lock, self._file_lock():
+                # Celý dokument nahrazuje i čekající dílčí změny
+                self._pending.clear()
+                self._write_atomic(config)
+                # Uložená data rovnou převzít do cache, aby se soubor znovu neparsoval
+                self._cache = copy.deepcopy(config)
+                self._cache_signature = self._file_signature()
         except Exception as e:
             print(f"Chyba při ukládání konfigurace: {e}")
+    
+    def flush(self):
+        """Zapíše čekající změny kontejnerů jedním zápisem (read-modify-write pod zámkem)"""
+        with self._cache_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            
+            try:
+                with self._file_lock():
+                    # Načíst aktuální stav ze souboru (mohl ho změnit jiný proces) a aplikovat změny
+                    config = self._parse_config()
+                    self._apply_pending(config)
+                    self._write_atomic(config)
+                    self._pending.clear()
+                    self._cache = config
+                    self._cache_signature = self._file_signature()
+            except Exception as e:
+                print(f"Chyba při ukládání konfigurace: {e}")
+    
+    def _update_container(self, container_id: str, container_config: Optional[Dict[str, Any]]):
+        """Zaznamená změnu kontejneru a naplánuje zápis (dávky změn se sloučí do jednoho)"""
+        with self._cache_lock:
+            config = self._cached_config()
+            self._pending[container_id] = copy.deepcopy(container_config)
+            self._apply_pending(config)
+            
+            if self.write_delay <= 0:
+                self.flush()
+            elif self._flush_timer is None:
+                # Odložený zápis - nejpozději po write_delay od první změny
+                self._flush_timer = threading.Timer(self.write_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def get_setting(self, key: str, default: Any = None) -> Any:
+        """Vrátí hodnotu ze sekce 'settings' (např. read_backend: files | cli, engine: subprocess | worker)"""
+        settings = self._cached_config().get('settings') or {}
+        if not isinstance(settings, dict):
+            return default
+        return copy.deepcopy(settings.get(key, default))
 
     # --- Metody volané z container_manager.py ---
 
     def get_all_containers(self) -> Dict[str, Dict[str, Any]]:
         """Vrátí slovník všech kontejnerů pro get_all_containers_info."""
-        config = self.load_config()
-        containers = config.get('containers', {})
+        containers = self._cached_config().get('containers', {})
         # Zajištění, že vracíme vždy dict, i kdyby v yaml bylo None
-        return containers if containers is not None else {}
+        return copy.deepcopy(containers) if containers is not None else {}
 
     def get_container_config(self, container_id: str) -> Dict[str, Any]:
         """Vrátí konfiguraci konkrétního kontejneru pro start_container."""
-        containers = self.get_all_containers()
-        return containers.get(container_id, {})
+        containers = self._cached_config().get('containers') or {}
+        return copy.deepcopy(containers.get(container_id, {}))
+
+    def get_autostart_containers(self) -> Dict[str, Dict[str, Any]]:
+        """Vrátí kontejnery s nastaveným autostartem."""
+        return {container_id: config for container_id, config in self.get_all_containers().items()
+                if config.get('autostart')}
 
     def save_container_config(self, container_id: str, container_config: Dict[str, Any]):
         """Uloží/Aktualizuje konfiguraci kontejneru (voláno při create a save_running)."""
-        config = self.load_config()
-        if 'containers' not in config:
-            config['containers'] = {}
-        
-        config['containers'][container_id] = container_config
-        self.save_config(config)
+        self._update_container(container_id, container_config)
 
     def delete_container_config(self, container_id: str):
         """Smaže konfiguraci kontejneru (voláno při delete_container)."""
-        config = self.load_config()
-        containers = config.get('containers', {})
-        
-        if container_id in containers:
-            del config['containers'][container_id]
-            self.save_config(config)
\ No newline at end of file
+        if container_id in (self._cached_config().get('containers') or {}):
+            self._update_container(container_id, None)
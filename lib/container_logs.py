@@ -0,0 +1,202 @@
+"""Zachytávání výstupu kontejnerů do rotovaných log souborů"""
+
+import os
+import time
+import mmap
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple, Iterator, Any
+
+class RotatingLog:
+    """Log soubor s omezenou velikostí - po překročení limitu se posune do .1, .2, ...
+    
+    Do souboru zapisuje přímo proces kontejneru (vlastní deskriptor s O_APPEND), proto se
+    rotuje kopií a zkrácením (copytruncate) - přesunutý soubor by proces dál plnil.
+    """
+    
+    def __init__(self, path: Path, max_bytes: int = 10 * 1024 * 1024, backups: int = 2):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+    
+    def rotate_external(self):
+        """Zrotuje soubor, pokud překročil limit (kopie do .1, zkrácení původního)"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return
+            if size <= self.max_bytes:
+                return
+            for i in range(self.backups - 1, 0, -1):
+                older = Path(f"{self.path}.{i}")
+                if older.exists():
+                    os.replace(older, f"{self.path}.{i + 1}")
+            if self.backups > 0:
+                shutil.copyfile(self.path, f"{self.path}.1")
+            os.truncate(self.path, 0)
+    
+    def files(self) -> List[Path]:
+        """Soubory logu od nejnovějšího po nejstarší"""
+        return [self.path] + [Path(f"{self.path}.{i}") for i in range(1, self.backups + 1)]
+
+def _tail_file(path: Path, lines: int) -> Tuple[bytes, int, bool]:
+    """Vrátí posledních `lines` řádků souboru hledáním od konce (mmap, bez čtení celého souboru)
+    
+    Vrací (data, počet nalezených řádků, zda bylo dosaženo začátku souboru).
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0 or lines <= 0:
+                return b'', 0, True
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                # Koncový znak nového řádku nezakládá další (prázdný) řádek
+                pos = size - 1 if mm[size - 1:size] == b'\n' else size
+                count = 0
+                start = 0
+                while count < lines:
+                    i = mm.rfind(b'\n', 0, pos)
+                    count += 1
+                    if i < 0:
+                        start = 0
+                        break
+                    start = i + 1
+                    pos = i
+                else:
+                    return mm[start:size], count, False
+                return mm[start:size], count, True
+    except (OSError, ValueError):
+        return b'', 0, True
+
+class ContainerLogs:
+    """Správa log souborů všech kontejnerů"""
+    
+    def __init__(self, log_dir: Path = None, max_bytes: int = 10 * 1024 * 1024, backups: int = 2):
+        if log_dir is None:
+            log_dir = Path.home() / '.udocker_manager' / 'logs'
+        
+        self.log_dir = Path(log_dir)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._logs: Dict[str, RotatingLog] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, container_id: str) -> Path:
+        safe_name = container_id.replace('/', '_')
+        return self.log_dir / f"{safe_name}.log"
+    
+    def log(self, container_id: str) -> RotatingLog:
+        """Vrátí (a případně vytvoří) log kontejneru - jen pro spouštění kontejneru"""
+        with self._lock:
+            log = self._logs.get(container_id)
+            if log is None:
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                log = RotatingLog(self._path(container_id), self.max_bytes, self.backups)
+                self._logs[container_id] = log
+            return log
+    
+    def _lookup(self, container_id: str) -> RotatingLog:
+        """Log pro čtení - neregistruje ho ani nevytváří adresář (ID pochází z URL)"""
+        with self._lock:
+            log = self._logs.get(container_id)
+        return log or RotatingLog(self._path(container_id), self.max_bytes, self.backups)
+    
+    def tail(self, container_id: str, lines: int = 100) -> Tuple[bool, str]:
+        """Vrátí posledních N řádků logu (pokračuje do starších rotovaných souborů)"""
+        log = self._lookup(container_id)
+        chunks = []
+        remaining = lines
+        for path in log.files():
+            if remaining <= 0 or not path.exists():
+                break
+            data, found, reached_start = _tail_file(path, remaining)
+            if data:
+                if not data.endswith(b'\n'):
+                    data += b'\n'
+                chunks.append(data)
+            remaining -= found
+            if not reached_start:
+                break
+        
+        if not chunks and not log.path.exists():
+            return False, f"Pro kontejner {container_id} nejsou žádné logy"
+        return True, b''.join(reversed(chunks)).decode('utf-8', errors='replace')
+    
+    def follow(self, container_id: str, interval: float = 0.5, max_batch: int = 64 * 1024,
+               max_lag: int = 1024 * 1024, keepalive: float = 15) -> Iterator[Dict[str, Any]]:
+        """Sleduje log od aktuálního konce a vrací nové řádky po dávkách (jedna dávka za interval)
+        
+        Soubor se kontroluje přes stat - čte se jen to, co přibylo. Klient, který nestíhá
+        a jeho zpoždění za koncem souboru přesáhne max_lag bajtů, je odpojen
+        (událost {'dropped': True}) místo neomezeného bufferování. Prázdná událost je keepalive.
+        """
+        path = self._path(container_id)
+        f = None
+        inode = None
+        pending = b''
+        last_sent = time.monotonic()
+        
+        # Existující obsah se přeskočí - počáteční tail poskytuje tail()
+        try:
+            f = open(path, 'rb')
+            inode = os.fstat(f.fileno()).st_ino
+            f.seek(0, os.SEEK_END)
+        except OSError:
+            f = None
+        
+        try:
+            while True:
+                chunk = b''
+                if f is None:
+                    try:
+                        # Soubor vznikl až během sledování - číst od začátku
+                        f = open(path, 'rb')
+                        inode = os.fstat(f.fileno()).st_ino
+                    except OSError:
+                        f = None
+                
+                if f is not None:
+                    # Přečíst, co přibylo od minula (nejvýš max_batch bajtů na dávku)
+                    chunk = f.read(max_batch)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        st = None
+                    
+                    if st is not None and st.st_ino == inode and st.st_size - f.tell() > max_lag:
+                        yield {'dropped': True, 'lag': st.st_size - f.tell()}
+                        return
+                    
+                    # Rotace - po dočtení starého souboru pokračovat novým od začátku
+                    if not chunk and st is not None and st.st_ino != inode:
+                        f.close()
+                        f = None
+                        continue
+                    # Rotace zkrácením (copytruncate) - stejný soubor od začátku
+                    if not chunk and st is not None and st.st_size < f.tell():
+                        f.seek(0)
+                        pending = b''
+                        continue
+                
+                lines = []
+                if chunk:
+                    pending += chunk
+                    *complete, pending = pending.split(b'\n')
+                    lines = [line.decode('utf-8', errors='replace') for line in complete]
+                
+                if lines:
+                    last_sent = time.monotonic()
+                    yield {'lines': lines}
+                elif time.monotonic() - last_sent >= keepalive:
+                    last_sent = time.monotonic()
+                    yield {}
+                
+                # Plná dávka znamená, že v souboru čeká další obsah - nečekat
+                if len(chunk) < max_batch:
+                    time.sleep(interval)
+        finally:
+            if f is not None:
+                f.close()
@@ -1,16 +1,183 @@
 """Manažer pro správu kontejnerů"""
 
-from typing import Dict, Tuple, Any
+import json
+import time
+import queue
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Any, List, Set, Optional, Callable, Iterator
 from lib.config_manager import ConfigManager
 from lib.udocker_wrapper import UDockerWrapper
+from lib.pull_jobs import PullJobQueue
+from lib.autostart import AutostartRunner
+from lib.supervisor import find_run_pids
+from lib.fileutil import file_lock
+
+# Akce povolené v dávce (/bulk)
+BULK_ACTIONS = ('start', 'stop', 'restart', 'delete', 'save')
+
+def _managed_entry(container_id: str, config: Dict[str, Any],
+                   running_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sloučí konfiguraci spravovaného kontejneru s jeho běhovým stavem"""
+    container_name = config.get('name', container_id)
+    
+    # Pokud existuje, aktualizovat informace z inspect
+    if running_info:
+        # Mergovat konfiguraci s aktuálními informacemi z inspect
+        return {
+            **config,
+            'id': running_info.get('id', container_id),  # Použít skutečné ID existujícího kontejneru
+            'name': container_name,  # Zachovat název z konfigurace
+            'running': running_info['running'],
+            'managed': True,
+            # Aktualizovat z běžícího stavu (může se změnit)
+            'image': running_info.get('image', config.get('image', 'unknown')),
+        }
+    return {
+        **config,
+        'id': container_id,
+        'name': container_name,
+        'running': False,
+        'managed': True
+    }
+
+def _external_entry(container_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Položka pro externí (nespravovaný) kontejner"""
+    # Použít informace z inspect, které už máme z get_running_containers
+    return {
+        'id': container_info['id'],
+        'name': container_info['name'],
+        'running': container_info['running'],
+        'managed': False,
+        'autostart': False,
+        'image': container_info.get('image', 'unknown'),
+        'ports': container_info.get('ports', []),
+        'volumes': container_info.get('volumes', []),
+        'env': container_info.get('env', []),
+        'command': container_info.get('command', '')
+    }
+
+def _state_digest(prefix: str, state: Any) -> str:
+    """Krátký hash obsahu stavu (pro ETag)"""
+    raw = json.dumps(state, sort_keys=True, default=str).encode('utf-8')
+    return prefix + hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+class ContainerView:
+    """Materializovaný sloučený pohled konfigurace a běžících kontejnerů
+    
+    Při každé aktualizaci se porovnají nové vstupy s předchozími a přepočítají se
+    jen položky dotčené změnou. Spravované kontejnery se hledají přes indexy
+    názvů a ID, takže slučování je lineární.
+    """
+    
+    def __init__(self):
+        self._config: Dict[str, Dict[str, Any]] = {}
+        self._running: Dict[str, Dict[str, Any]] = {}
+        self._names: Dict[str, Set[str]] = {}  # název -> ID spravovaných kontejnerů
+        self._managed: Dict[str, Dict[str, Any]] = {}
+        self._external: Dict[str, Dict[str, Any]] = {}  # running ID -> položka
+        self._result: Dict[str, Dict[str, Any]] = {}
+        self.updated_entries = 0
+        self.generation = 0  # Zvyšuje se při každé změně pohledu
+    
+    def _is_managed(self, container_info: Dict[str, Any]) -> bool:
+        name = container_info['name']
+        return name in self._names or container_info['id'] in self._config or name in self._config
+    
+    def update(self, config_containers: Dict[str, Dict[str, Any]],
+               running_containers: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Aplikuje změny vstupů a vrátí sloučený pohled"""
+        running_by_id = {c['id']: c for c in running_containers}
+        running_by_name = {c['name']: c for c in running_containers}
+        
+        changed_config = {cid for cid in config_containers.keys() | self._config.keys()
+                          if config_containers.get(cid) != self._config.get(cid)}
+        changed_running = {rid for rid in running_by_id.keys() | self._running.keys()
+                           if running_by_id.get(rid) != self._running.get(rid)}
+        
+        if not changed_config and not changed_running and \
+                list(config_containers) == list(self._config) and list(running_by_id) == list(self._running):
+            return dict(self._result)
+        
+        # Klíče (název/ID), jejichž položky je třeba přepočítat
+        touched: Set[str] = set()
+        
+        # Aktualizovat index názvů pro změněnou konfiguraci
+        for cid in changed_config:
+            old = self._config.get(cid)
+            if old is not None:
+                old_name = old.get('name', cid)
+                self._names.get(old_name, set()).discard(cid)
+                if not self._names.get(old_name):
+                    self._names.pop(old_name, None)
+                touched.add(old_name)
+            new = config_containers.get(cid)
+            if new is not None:
+                new_name = new.get('name', cid)
+                self._names.setdefault(new_name, set()).add(cid)
+                touched.add(new_name)
+            touched.add(cid)
+        
+        for rid in changed_running:
+            for info in (self._running.get(rid), running_by_id.get(rid)):
+                if info is not None:
+                    touched.add(info['id'])
+                    touched.add(info['name'])
+        
+        self._config = config_containers
+        self._running = running_by_id
+        
+        # Přepočítat dotčené spravované kontejnery
+        for key in touched:
+            for cid in self._names.get(key, set()) | ({key} if key in config_containers else set()):
+                config = config_containers[cid]
+                running_info = running_by_name.get(config.get('name', cid)) or running_by_id.get(cid)
+                self._managed[cid] = _managed_entry(cid, config, running_info)
+                self.updated_entries += 1
+        for cid in changed_config - config_containers.keys():
+            self._managed.pop(cid, None)
+        
+        # Položky externích kontejnerů závisí jen na běhovém stavu
+        for rid in changed_running:
+            info = running_by_id.get(rid)
+            if info is None:
+                self._external.pop(rid, None)
+            else:
+                self._external[rid] = _external_entry(info)
+                self.updated_entries += 1
+        
+        # Sestavit výsledek: spravované v pořadí konfigurace, pak externí
+        result = {cid: self._managed[cid] for cid in config_containers}
+        for rid, info in running_by_id.items():
+            if not self._is_managed(info):
+                result[info['name']] = self._external[rid]
+        self._result = result
+        self.generation += 1
+        return dict(result)
 
 class ContainerManager:
-    def __init__(self, config_manager: ConfigManager, udocker: UDockerWrapper):
+    def __init__(self, config_manager: ConfigManager, udocker: UDockerWrapper,
+                 pull_jobs: PullJobQueue = None):
         self.config = config_manager
         self.udocker = udocker
+        self.pull_jobs = pull_jobs or PullJobQueue(udocker)
+        self.view = ContainerView()
+        self._view_lock = threading.Lock()
+        self.last_autostart: Optional[AutostartRunner] = None
+        # Verze stavu pro ETag - hash obsahu, takže je stejná ve všech workerech
+        self._containers_etag = ''
+        self._containers_etag_generation = -1
+        self._images: Optional[List[Dict[str, Any]]] = None
+        self._images_etag = ''
+        self._images_lock = threading.Lock()
     
     def get_all_containers_info(self) -> Dict[str, Dict[str, Any]]:
         """Získá informace o všech kontejnerech - spravovaných i externích"""
+        return self.containers_state()[0]
+    
+    def containers_state(self) -> Tuple[Dict[str, Dict[str, Any]], str]:
+        """Vrátí sloučený pohled kontejnerů a jeho verzi (mění se jen při změně obsahu)"""
         config_containers = self.config.get_all_containers()
         if config_containers is None:
             config_containers = {}
@@ -18,69 +185,22 @@ class ContainerManager:
         # Získat běžící kontejnery s kompletními detaily z inspect
         running_containers = self.udocker.get_running_containers()
         
-        # Vytvořit mapu název -> container info pro rychlé vyhledávání
-        running_by_name = {c['name']: c for c in running_containers}
-        running_by_id = {c['id']: c for c in running_containers}
-        
-        all_containers = {}
-        
-        # Přidat spravované kontejnery z konfigurace
-        for container_id, config in config_containers.items():
-            container_name = config.get('name', container_id)
-            
-            # Zkontrolovat, zda běží podle názvu nebo ID
-            running_info = running_by_name.get(container_name) or running_by_id.get(container_id)
-            is_running = running_info is not None
-            
-            # Pokud běží, aktualizovat informace z inspect
-            if is_running and running_info:
-                # Mergovat konfiguraci s aktuálními informacemi z inspect
-                all_containers[container_id] = {
-                    **config,
-                    'id': running_info.get('id', container_id),  # Použít skutečné ID z běžícího kontejneru
-                    'name': container_name,  # Zachovat název z konfigurace
-                    'running': True,
-                    'managed': True,
-                    # Aktualizovat z běžícího stavu (může se změnit)
-                    'image': running_info.get('image', config.get('image', 'unknown')),
-                }
-            else:
-                all_containers[container_id] = {
-                    **config,
-                    'id': container_id,
-                    'name': container_name,
-                    'running': False,
-                    'managed': True
-                }
-        
-        # Přidat externí (nespravované) běžící kontejnery
-        for container_info in running_containers:
-            container_name = container_info['name']
-            container_id = container_info['id']
-            
-            # Zkontrolovat, zda už není v config pod názvem nebo ID
-            already_managed = False
-            for cfg_id, cfg in config_containers.items():
-                if cfg.get('name') == container_name or cfg_id == container_id or cfg_id == container_name:
-                    already_managed = True
-                    break
-            
-            if not already_managed:
-                # Použít informace z inspect, které už máme z get_running_containers
-                all_containers[container_name] = {
-                    'id': container_id,
-                    'name': container_name,
-                    'running': True,
-                    'managed': False,
-                    'autostart': False,
-                    'image': container_info.get('image', 'unknown'),
-                    'ports': container_info.get('ports', []),
-                    'volumes': container_info.get('volumes', []),
-                    'env': container_info.get('env', []),
-                    'command': container_info.get('command', '')
-                }
-        
-        return all_containers
+        # Sloučený pohled se aktualizuje jen o změněné položky
+        with self._view_lock:
+            containers = self.view.update(config_containers, running_containers)
+            if self.view.generation != self._containers_etag_generation:
+                self._containers_etag = _state_digest('c', list(containers.items()))
+                self._containers_etag_generation = self.view.generation
+            return containers, self._containers_etag
+    
+    def images_state(self) -> Tuple[List[Dict[str, Any]], str]:
+        """Vrátí seznam images a jeho verzi (mění se jen při změně obsahu)"""
+        images = self.udocker.get_images()
+        with self._images_lock:
+            if images != self._images:
+                self._images = images
+                self._images_etag = _state_digest('i', images)
+            return images, self._images_etag
     
     def create_and_start_container(self, container_config: Dict[str, Any]) -> Tuple[bool, str, str]:
         """Vytvoří kontejner, stáhne image pokud neexistuje, a spustí ho"""
@@ -90,7 +210,8 @@ class ContainerManager:
         # Kontrola, zda image existuje
         if not self.udocker.image_exists(image):
             print(f"Image {image} neexistuje, stahuji...")
-            success, message = self.udocker.pull_image(image)
+            # Připojit se k případnému už běžícímu stahování stejného image
+            success, message = self.pull_jobs.pull(image)
             if not success:
                 return False, f"Nelze stáhnout image: {message}", ""
         
@@ -115,7 +236,8 @@ class ContainerManager:
         """Aktualizuje kontejner - smaže starý a vytvoří nový s novou konfigurací"""
         # Zkusit zastavit a smazat starý kontejner (může už neexistovat)
         try:
-            stop_success, stop_msg = self.udocker.stop_container(container_id)
+            self.udocker.stop_container(container_id)
+            self.udocker.delete_container(container_id)
             # Ignorujeme chybu - kontejner možná už neexistuje
         except Exception as e:
             print(f"Upozornění při mazání starého kontejneru: {e}")
@@ -131,15 +253,29 @@ class ContainerManager:
         else:
             return False, f"Chyba při vytváření nového kontejneru: {message}"
     
-    def start_container(self, container_id: str) -> Tuple[bool, str]:
-        """Spustí kontejner s konfigurací"""
+    def _existing_containers(self) -> Set[str]:
+        """ID a názvy všech existujících kontejnerů (jeden výpis ps -a)"""
+        return {key for c in self.udocker.get_all_containers() for key in (c['id'], c['name'])}
+    
+    def start_container(self, container_id: str, existing: Set[str] = None) -> Tuple[bool, str]:
+        """Spustí kontejner s konfigurací (existing = sdílený výpis kontejnerů pro dávku)"""
+        # Zámek mezi procesy - jiný worker (nebo převzatý start) nespustí stejný kontejner podruhé
+        lock_file = self.config.config_dir / f".start.{container_id.replace('/', '_')}.lock"
+        with file_lock(lock_file):
+            return self._start_container(container_id, existing)
+    
+    def _start_container(self, container_id: str, existing: Optional[Set[str]]) -> Tuple[bool, str]:
         container_config = self.config.get_container_config(container_id)
         
+        # Proces mohl spustit i jiný worker nebo předchozí běh manageru - kontejnery ho přežijí
+        if self.udocker.supervisor.is_running(container_id) or find_run_pids(container_id):
+            return True, f"Kontejner {container_id} už běží"
+        
         # Pokud kontejner neexistuje, musíme ho nejdřív vytvořit
-        all_containers = self.udocker.get_all_containers()
-        container_exists = any(c['id'] == container_id or c['name'] == container_id for c in all_containers)
+        if existing is None:
+            existing = self._existing_containers()
         
-        if not container_exists:
+        if container_id not in existing:
             # Kontejner neexistuje, vytvoříme ho
             image = container_config.get('image', 'unknown')
             if image == 'unknown':
@@ -147,7 +283,7 @@ class ContainerManager:
             
             # Zkontrolovat, zda image existuje
             if not self.udocker.image_exists(image):
-                success, message = self.udocker.pull_image(image)
+                success, message = self.pull_jobs.pull(image)
                 if not success:
                     return False, f"Nelze stáhnout image: {message}"
             
@@ -155,6 +291,7 @@ class ContainerManager:
             success, message = self.udocker.create_container(container_id, image)
             if not success:
                 return False, f"Nelze vytvořit kontejner: {message}"
+            existing.add(container_id)
         
         # Nyní spustit kontejner
         return self.udocker.run_container(
@@ -162,16 +299,19 @@ class ContainerManager:
             volumes=container_config.get('volumes', []),
             ports=container_config.get('ports', []),
             env=container_config.get('env', []),
-            command=container_config.get('command')
+            command=container_config.get('command'),
+            ready_port=container_config.get('ready_port'),
+            ready_log=container_config.get('ready_log'),
+            ready_timeout=container_config.get('ready_timeout', 30)
         )
     
     def stop_container(self, container_id: str) -> Tuple[bool, str]:
-        """Zastaví kontejner"""
+        """Zastaví kontejner (bez smazání, další start ho jen znovu spustí)"""
         return self.udocker.stop_container(container_id)
     
     def delete_container(self, container_id: str) -> Tuple[bool, str]:
         """Smaže kontejner"""
-        # Nejdřív zkusit zastavit (smazat běžící kontejner)
+        # Nejdřív zastavit běžící proces kontejneru
         try:
             self.udocker.stop_container(container_id)
         except Exception:
@@ -213,19 +353,82 @@ class ContainerManager:
         config_containers = self.config.get_all_containers()
         
         for container in running:
-            if container['id'] not in config_containers:
+            if container['running'] and container['id'] not in config_containers:
                 print(f"  • Nalezen externí kontejner: {container['id']}")
     
-    def autostart_all(self) -> Dict[str, Tuple[bool, str]]:
-        """Spustí všechny kontejnery s nastaveným autostartem"""
+    def autostart_all(self, workers: int = 4,
+                      on_progress: Callable[[], None] = None) -> Dict[str, Tuple[bool, str]]:
+        """Spustí všechny kontejnery s nastaveným autostartem (paralelně, podle depends_on)"""
         results = {}
-        containers = self.config.get_all_containers()
+        containers = self.config.get_autostart_containers()
         if containers is None:
             return results
         
-        for container_id, config in containers.items():
-            if config.get('autostart'):
-                success, message = self.start_container(container_id)
-                results[config['name']] = (success, message)
+        # Jeden výpis kontejnerů pro celý autostart místo ps -a při každém startu
+        existing = self._existing_containers()
+        runner = AutostartRunner(lambda container_id: self.start_container(container_id, existing),
+                                 workers=workers, on_progress=on_progress)
+        self.last_autostart = runner
+        report = runner.run(containers)
+        for container_id, entry in report.items():
+            results[entry['name']] = (entry['success'], entry['message'])
+        
+        return results
+    
+    def bulk(self, items: List[Dict[str, Any]], workers: int = 4) -> Iterator[Dict[str, Any]]:
+        """Provede dávku akcí v omezeném poolu a vrací výsledky, jak doběhnou
+        
+        Akce nad stejným kontejnerem běží postupně v zadaném pořadí, různé kontejnery
+        paralelně. Výpis existujících kontejnerů se pořídí jednou pro celou dávku.
+        """
+        groups: Dict[str, List[Tuple[int, str]]] = {}
+        for index, item in enumerate(items):
+            action = item.get('action')
+            container_id = item.get('container_id')
+            if action not in BULK_ACTIONS or not container_id:
+                yield {'index': index, 'action': action, 'container_id': container_id, 'success': False,
+                       'message': f"Neplatná položka (akce: {', '.join(BULK_ACTIONS)})", 'duration': 0.0}
+                continue
+            groups.setdefault(container_id, []).append((index, action))
         
-        return results
\ No newline at end of file
+        if not groups:
+            return
+        
+        existing = None
+        if any(action in ('start', 'restart') for actions in groups.values() for _, action in actions):
+            existing = self._existing_containers()
+        
+        results: 'queue.Queue[Dict[str, Any]]' = queue.Queue()
+        
+        def run_group(container_id: str, actions: List[Tuple[int, str]]):
+            for index, action in actions:
+                started = time.monotonic()
+                try:
+                    success, message = self._bulk_action(action, container_id, existing)
+                except Exception as e:
+                    success, message = False, f"Chyba: {e}"
+                results.put({'index': index, 'action': action, 'container_id': container_id,
+                             'success': success, 'message': message,
+                             'duration': round(time.monotonic() - started, 3)})
+        
+        pending = sum(len(actions) for actions in groups.values())
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='bulk') as pool:
+            for container_id, actions in groups.items():
+                pool.submit(run_group, container_id, actions)
+            for _ in range(pending):
+                yield results.get()
+    
+    def _bulk_action(self, action: str, container_id: str, existing: Optional[Set[str]]) -> Tuple[bool, str]:
+        if action == 'start':
+            return self.start_container(container_id, existing)
+        if action == 'stop':
+            return self.stop_container(container_id)
+        if action == 'restart':
+            self.stop_container(container_id)  # Neběžící kontejner se prostě jen spustí
+            return self.start_container(container_id, existing)
+        if action == 'delete':
+            result = self.delete_container(container_id)
+            if existing is not None:
+                existing.discard(container_id)
+            return result
+        return self.save_running_container(container_id)
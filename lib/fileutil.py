@@ -0,0 +1,47 @@
+"""Souborové operace sdílené mezi procesy: zámek (fcntl) a atomický zápis"""
+
+import os
+import fcntl
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import Union
+
+@contextlib.contextmanager
+def file_lock(lock_file: Union[str, Path]):
+    """Exkluzivní zámek sdílený mezi procesy (fcntl) po dobu bloku with"""
+    with open(lock_file, 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+def write_atomic(path: Union[str, Path], data: bytes, durable: bool = False) -> int:
+    """Zapíše data do dočasného souboru vedle cíle a přejmenuje ho (os.replace) - soubor nikdy není useknutý
+    
+    durable = fsync souboru i adresáře, aby zápis přežil pád systému. Při chybě se dočasný
+    soubor smaže a výjimka projde dál. Vrací mtime zapsaného souboru (ns).
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+    
+    if durable:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return mtime
@@ -0,0 +1,153 @@
+"""Perzistentní index image -> kontejnery, které ho používají (pro prune)"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+from lib.fileutil import file_lock, write_atomic
+
+DEFAULT_REGISTRY_PREFIXES = ('docker.io/', 'index.docker.io/', 'registry-1.docker.io/')
+
+def normalize_image(image: str) -> str:
+    """Sjednotí zápis image (docker.io/library/nginx -> nginx:latest), aby šel porovnat přesnou shodou"""
+    image = (image or '').strip()
+    for prefix in DEFAULT_REGISTRY_PREFIXES:
+        if image.startswith(prefix):
+            image = image[len(prefix):]
+            break
+    if image.startswith('library/'):
+        image = image[len('library/'):]
+    if image and '@' not in image and ':' not in image.rsplit('/', 1)[-1]:
+        image += ':latest'
+    return image
+
+class ImageIndex:
+    """Reference na images z kontejnerů - aktualizuje se při create/delete, uložený v JSON
+    
+    Klíčem kontejneru je jeho název (nebo ID, pokud název nemá). Soubor se zapisuje
+    atomicky; změní-li ho jiný proces, při dalším přístupu se znovu načte. Úpravy
+    (načtení, změna, zápis) drží zámek sdílený mezi procesy, aby se změny workerů neztrácely.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_file = self.path.with_name(f".{self.path.name}.lock")
+        self._containers: Dict[str, Dict[str, Optional[str]]] = {}  # klíč -> {'image', 'id'}
+        self._refs: Dict[str, Set[str]] = {}  # image -> klíče kontejnerů
+        self._signature = None
+        self._lock = threading.RLock()
+    
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_ino)
+    
+    def _load(self):
+        """Načte index ze souboru, pokud se od posledního čtení změnil"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        containers = {}
+        if signature is not None:
+            try:
+                with open(self.path) as f:
+                    containers = json.load(f).get('containers', {})
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Chyba při načítání indexu images: {e}")
+        self._containers = containers
+        self._refs = {}
+        for key, entry in containers.items():
+            self._refs.setdefault(entry['image'], set()).add(key)
+        self._signature = signature
+    
+    def _save(self):
+        data = json.dumps({'version': 1, 'containers': self._containers}, indent=1, sort_keys=True)
+        try:
+            write_atomic(self.path, data.encode('utf-8'))
+            self._signature = self._file_signature()
+        except Exception as e:
+            print(f"Chyba při ukládání indexu images: {e}")
+    
+    def _add(self, key: str, image: str, container_id: Optional[str]):
+        self._remove(key)
+        image = normalize_image(image)
+        self._containers[key] = {'image': image, 'id': container_id}
+        self._refs.setdefault(image, set()).add(key)
+    
+    def _remove(self, key: str) -> bool:
+        entry = self._containers.pop(key, None)
+        if entry is None:
+            return False
+        keys = self._refs.get(entry['image'])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._refs[entry['image']]
+        return True
+    
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+    
+    def add(self, name: str, image: str, container_id: str = None):
+        """Zaznamená nový kontejner (volá se po create)"""
+        with self._lock, file_lock(self.lock_file):
+            self._load()
+            self._add(name, image, container_id)
+            self._save()
+    
+    def remove(self, container: str):
+        """Odebere kontejner podle názvu nebo ID (volá se po delete)"""
+        with self._lock, file_lock(self.lock_file):
+            self._load()
+            keys = [key for key, entry in self._containers.items() if key == container or entry.get('id') == container]
+            for key in keys:
+                self._remove(key)
+            if keys:
+                self._save()
+    
+    def reconcile(self, listing: List[Dict[str, str]], resolve_image=None) -> List[str]:
+        """Srovná index s výpisem kontejnerů (změny mimo manager); vrací kontejnery s neznámým image
+        
+        resolve_image(entry) se volá jen pro nové kontejnery, u kterých výpis neuvádí image.
+        """
+        with self._lock, file_lock(self.lock_file):
+            self._load()
+            changed = 0
+            seen = set()
+            unresolved = []
+            for entry in listing:
+                key = entry.get('name') or entry['id']
+                seen.add(key)
+                current = self._containers.get(key)
+                image = entry.get('image') or (current['image'] if current else None)
+                if not image and resolve_image is not None:
+                    image = resolve_image(entry)
+                if not image:
+                    unresolved.append(key)
+                    continue
+                if current is None or current['image'] != normalize_image(image) or current.get('id') != entry['id']:
+                    self._add(key, image, entry['id'])
+                    changed += 1
+            
+            for key in [key for key in self._containers if key not in seen]:
+                self._remove(key)
+                changed += 1
+            
+            if changed or not self.exists:
+                self._save()
+            return unresolved
+    
+    def containers_using(self, image: str) -> Set[str]:
+        """Kontejnery používající image (jedno vyhledání ve slovníku)"""
+        with self._lock:
+            self._load()
+            return set(self._refs.get(normalize_image(image), ()))
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load()
+            return {'containers': len(self._containers), 'images': len(self._refs)}
@@ -0,0 +1,87 @@
+"""Vykreslování hlavní stránky - šablony zkompilované jednou, řádky cachované podle stavu"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from jinja2 import Environment, Template
+from markupsafe import Markup
+from templates.html_template import HTML_TEMPLATE, CONTAINER_ROW_TEMPLATE, IMAGE_ROW_TEMPLATE
+
+class PageRenderer:
+    """Drží zkompilované šablony a cache vykreslených řádků (klíč = hash stavu řádku)"""
+    
+    def __init__(self, env: Environment, max_rows: int = 5000):
+        self.env = env
+        self.max_rows = max_rows
+        self._page: Optional[Template] = None
+        self._container_row: Optional[Template] = None
+        self._image_row: Optional[Template] = None
+        self._rows: 'OrderedDict[str, Markup]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.compile_ms = 0.0
+        self.row_hits = 0
+        self.row_misses = 0
+        self.last_timing: Dict[str, float] = {}
+    
+    def _compile(self) -> float:
+        """Zkompiluje šablony při prvním použití; vrací dobu kompilace v ms (0 = už zkompilováno)"""
+        with self._lock:
+            if self._page is not None:
+                return 0.0
+            start = time.perf_counter()
+            self._container_row = self.env.from_string(CONTAINER_ROW_TEMPLATE)
+            self._image_row = self.env.from_string(IMAGE_ROW_TEMPLATE)
+            self._page = self.env.from_string(HTML_TEMPLATE)
+            self.compile_ms = (time.perf_counter() - start) * 1000
+            return self.compile_ms
+    
+    def _cached_row(self, kind: str, template: Template, state: Any, **context) -> Markup:
+        """Vrátí vykreslený řádek z cache, nebo ho vykreslí a uloží"""
+        raw = json.dumps(state, sort_keys=True, default=str).encode('utf-8')
+        key = kind + hashlib.blake2b(raw, digest_size=16).hexdigest()
+        with self._lock:
+            html = self._rows.get(key)
+            if html is not None:
+                self._rows.move_to_end(key)
+                self.row_hits += 1
+                return html
+        
+        html = Markup(template.render(**context).strip())
+        with self._lock:
+            self.row_misses += 1
+            self._rows[key] = html
+            while len(self._rows) > self.max_rows:
+                self._rows.popitem(last=False)
+        return html
+    
+    def container_row(self, container_id: str, container: Dict[str, Any]) -> Markup:
+        return self._cached_row('c', self._container_row, (container_id, container), id=container_id, c=container)
+    
+    def image_row(self, image: Dict[str, Any]) -> Markup:
+        return self._cached_row('i', self._image_row, image, img=image)
+    
+    def render_index(self, containers: Dict[str, Dict[str, Any]], images: List[Dict[str, Any]],
+                     **context) -> Tuple[str, Dict[str, float]]:
+        """Vykreslí hlavní stránku; vrací (html, časy kompilace a renderu v ms)"""
+        compile_ms = self._compile()
+        start = time.perf_counter()
+        html = self._page.render(containers=containers, images=images,
+                                 container_row=self.container_row, image_row=self.image_row, **context)
+        timing = {'compile': compile_ms, 'render': (time.perf_counter() - start) * 1000}
+        self.last_timing = timing
+        return html, timing
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = len(self._rows)
+        return {
+            'compiled': self._page is not None,
+            'compile_ms': round(self.compile_ms, 3),
+            'cached_rows': rows,
+            'row_hits': self.row_hits,
+            'row_misses': self.row_misses,
+            'last_timing': dict(self.last_timing)
+        }
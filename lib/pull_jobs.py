@@ -0,0 +1,156 @@
+"""Fronta úloh pro stahování images na pozadí"""
+
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from lib.udocker_wrapper import UDockerWrapper
+
+class PullJob:
+    """Jedno stahování image - sdílené všemi, kdo o stejný image požádali"""
+    
+    def __init__(self, image: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.image = image
+        self.status = 'queued'
+        self.success = None
+        self.message = 'Čeká ve frontě...'
+        self.progress = 0
+        self.downloaded = 0
+        self.total = 0
+        self.waiters = 1
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.events: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+    
+    @property
+    def done(self) -> bool:
+        return self.status in ('done', 'failed')
+    
+    def _publish(self, event: Dict[str, Any]):
+        """Zaznamená událost a probudí všechny čekající"""
+        with self._cond:
+            if 'progress' in event:
+                self.progress = event['progress']
+            if 'message' in event:
+                self.message = event['message']
+            self.downloaded = event.get('downloaded', self.downloaded)
+            self.total = event.get('total', self.total)
+            self.events.append(event)
+            self._cond.notify_all()
+    
+    def _finish(self, success: bool, message: str):
+        with self._cond:
+            self.success = success
+            self.status = 'done' if success else 'failed'
+            self.finished = time.time()
+            if success:
+                self.progress = 100
+            self.message = message
+            self.events.append({'phase': 'done', 'success': success, 'message': message})
+            self._cond.notify_all()
+    
+    def wait(self, timeout: float = None) -> Tuple[bool, str]:
+        """Počká na dokončení úlohy"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.done, timeout):
+                return False, f"Stahování {self.image} stále probíhá"
+            return self.success, self.message
+    
+    def follow(self, keepalive: float = 15) -> Iterator[Optional[Dict[str, Any]]]:
+        """Vrací události od začátku úlohy až po dokončení (None = keepalive)"""
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: index < len(self.events), keepalive)
+                pending = self.events[index:]
+                index += len(pending)
+            
+            if not pending:
+                yield None
+            for event in pending:
+                yield event
+                if event.get('phase') == 'done':
+                    return
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'image': self.image,
+            'status': self.status,
+            'success': self.success,
+            'message': self.message,
+            'progress': self.progress,
+            'downloaded': self.downloaded,
+            'total': self.total,
+            'waiters': self.waiters,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished
+        }
+
+class PullJobQueue:
+    """Stahuje images v omezeném poolu workerů, souběžné požadavky na stejný image sdílí jednu úlohu"""
+    
+    def __init__(self, udocker: UDockerWrapper, workers: int = 2, keep_finished: int = 100):
+        self.udocker = udocker
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='pull')
+        self._jobs: 'OrderedDict[str, PullJob]' = OrderedDict()
+        self._active: Dict[str, PullJob] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, image: str) -> PullJob:
+        """Zařadí stažení image, nebo vrátí už běžící úlohu pro stejný image"""
+        with self._lock:
+            job = self._active.get(image)
+            if job is not None:
+                job.waiters += 1
+                return job
+            
+            job = PullJob(image)
+            self._active[image] = job
+            self._jobs[job.id] = job
+            self._trim()
+        
+        self._pool.submit(self._run, job)
+        return job
+    
+    def pull(self, image: str, timeout: float = None) -> Tuple[bool, str]:
+        """Stáhne image přes frontu a počká na výsledek"""
+        return self.submit(image).wait(timeout)
+    
+    def get(self, job_id: str) -> Optional[PullJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+    
+    def _trim(self):
+        """Zahodí nejstarší dokončené úlohy nad limit"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+    
+    def _run(self, job: PullJob):
+        job.status = 'running'
+        job.started = time.time()
+        success, message = False, "Chyba při stahování"
+        try:
+            for event in self.udocker.pull_image_stream(job.image):
+                if event.get('phase') == 'done':
+                    success, message = event['success'], event['message']
+                else:
+                    job._publish(event)
+        except Exception as e:
+            message = str(e)
+        finally:
+            with self._lock:
+                self._active.pop(job.image, None)
+            job._finish(success, message)
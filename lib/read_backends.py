@@ -0,0 +1,242 @@
+"""Backendy pro čtení stavu udockeru (CLI nebo přímo z ~/.udocker)"""
+
+import os
+import re
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+class CliBackend:
+    """Čte stav spouštěním udocker CLI (ps, images, inspect)"""
+    name = 'cli'
+    
+    def __init__(self, udocker):
+        self.udocker = udocker
+    
+    def list_containers(self, all_containers: bool = False) -> Optional[List[Dict[str, str]]]:
+        """Vrátí seznam kontejnerů (id, name, image) z výstupu udocker ps"""
+        result = self.udocker.query(['ps', '-a'] if all_containers else ['ps'])
+        if not result['success']:
+            return None
+        
+        containers = []
+        for line in (result['stdout'] or '').strip().split('\n'):
+            if not line.strip() or 'CONTAINER' in line.upper():
+                continue
+            
+            parts = line.split()
+            if not parts or len(parts) < 2:
+                continue
+            
+            container_id = parts[0]
+            
+            # Extrahovat název z hranatých závorek
+            # Formát: ['název']
+            name_match = re.search(r"\['([^']+)'\]", line)
+            if name_match:
+                container_name = name_match.group(1)
+            else:
+                # Pokud není v závorkách, použít ID
+                container_name = container_id
+            
+            # IMAGE je poslední sloupec za seznamem jmen
+            image = ''
+            image_match = re.search(r"\]\s+(\S+)\s*$", line)
+            if image_match:
+                image = image_match.group(1)
+            
+            containers.append({
+                'id': container_id,
+                'name': container_name,
+                'image': image
+            })
+        
+        return containers
+    
+    def list_images(self) -> Optional[List[Dict[str, str]]]:
+        """Vrátí seznam images z výstupu udocker images"""
+        result = self.udocker.query(['images'])
+        if not result['success']:
+            return None
+        
+        images = []
+        for line in (result['stdout'] or '').strip().split('\n')[1:]:
+            if line.strip():
+                parts = line.split()
+                if len(parts) >= 2:
+                    repo = parts[0]
+                    tag = parts[1] if len(parts) > 1 else 'latest'
+                    
+                    # udocker vypisuje "repo:tag  ." - druhý sloupec je jen příznak ochrany
+                    if tag in ('.', 'P') and ':' in repo.rsplit('/', 1)[-1]:
+                        repo, tag = repo.rsplit(':', 1)
+                    
+                    # Sestavit celé jméno
+                    full_name = f"{repo}:{tag}"
+                    
+                    # Odstranit trailing dvojtečku pokud existuje
+                    full_name = full_name.rstrip(':')
+                    
+                    images.append({
+                        'repository': repo,
+                        'tag': tag,
+                        'full_name': full_name
+                    })
+        return images
+    
+    def inspect(self, container_name: str) -> Optional[Dict[str, Any]]:
+        """Vrátí JSON z udocker inspect"""
+        result = self.udocker.query(['inspect', container_name])
+        if not result['success'] or not result['stdout']:
+            print(f"Inspect selhal pro {container_name}: {result.get('stderr', 'no output')}")
+            return None
+        
+        try:
+            return json.loads(result['stdout'])
+        except json.JSONDecodeError as e:
+            print(f"Chyba při parsování JSON pro {container_name}: {e}")
+            print(f"Výstup: {result['stdout'][:200]}")
+            return None
+    
+    def container_image(self, container_name: str) -> Optional[str]:
+        """CLI neposkytuje image kontejneru přímo"""
+        return None
+
+class FileBackend:
+    """Čte stav přímo z adresářového stromu udockeru bez spouštění procesů"""
+    name = 'files'
+    
+    def __init__(self, udocker_dir: Path = None):
+        if udocker_dir is None:
+            udocker_dir = os.environ.get('UDOCKER_DIR') or Path.home() / '.udocker'
+        
+        self.udocker_dir = Path(udocker_dir)
+        self.repos_dir = self.udocker_dir / 'repos'
+        self.containers_dir = self.udocker_dir / 'containers'
+        self.layers_dir = self.udocker_dir / 'layers'
+    
+    def _container_dirs(self) -> Optional[Dict[str, List[str]]]:
+        """Vrátí mapu container_id -> seznam jmen (jména jsou symlinky na adresář kontejneru)"""
+        try:
+            entries = list(os.scandir(self.containers_dir))
+        except OSError:
+            return None
+        
+        containers = {}
+        names = []
+        for entry in entries:
+            if entry.is_symlink():
+                names.append(entry)
+            elif entry.is_dir():
+                containers.setdefault(entry.name, [])
+        
+        for link in names:
+            try:
+                target = os.path.basename(os.readlink(link.path).rstrip('/'))
+            except OSError:
+                continue
+            if target in containers:
+                containers[target].append(link.name)
+        
+        return containers
+    
+    def _resolve(self, container_name: str) -> Optional[Path]:
+        """Najde adresář kontejneru podle jména nebo ID"""
+        path = self.containers_dir / container_name
+        try:
+            if path.is_dir():
+                return path.resolve()
+        except OSError:
+            pass
+        return None
+    
+    def _read_text(self, path: Path) -> Optional[str]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+    
+    def list_containers(self, all_containers: bool = False) -> Optional[List[Dict[str, str]]]:
+        """Vrátí seznam kontejnerů - stejně jako udocker ps (udocker nesleduje běh)"""
+        container_dirs = self._container_dirs()
+        if container_dirs is None:
+            return None
+        
+        containers = []
+        for container_id, names in sorted(container_dirs.items()):
+            image = self._read_text(self.containers_dir / container_id / 'imagerepo.name') or ''
+            containers.append({
+                'id': container_id,
+                'name': sorted(names)[0] if names else container_id,
+                'image': image
+            })
+        return containers
+    
+    def list_images(self) -> Optional[List[Dict[str, str]]]:
+        """Vrátí seznam images - tagy jsou adresáře v repos/ obsahující soubor TAG"""
+        if not self.repos_dir.is_dir():
+            return None
+        
+        images = []
+        for root, dirs, files in os.walk(self.repos_dir):
+            if 'TAG' not in files:
+                continue
+            
+            dirs[:] = []
+            repo = os.path.relpath(os.path.dirname(root), self.repos_dir)
+            tag = os.path.basename(root)
+            images.append({
+                'repository': repo,
+                'tag': tag,
+                'full_name': f"{repo}:{tag}"
+            })
+        
+        images.sort(key=lambda img: img['full_name'])
+        return images
+    
+    def inspect(self, container_name: str) -> Optional[Dict[str, Any]]:
+        """Vrátí obsah container.json (totéž, co vypisuje udocker inspect)"""
+        container_dir = self._resolve(container_name)
+        if container_dir is None:
+            return None
+        
+        try:
+            with open(container_dir / 'container.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Chyba při čtení container.json pro {container_name}: {e}")
+            return None
+    
+    def container_image(self, container_name: str) -> Optional[str]:
+        """Vrátí image kontejneru ze souboru imagerepo.name"""
+        container_dir = self._resolve(container_name)
+        if container_dir is None:
+            return None
+        return self._read_text(container_dir / 'imagerepo.name') or None
+    
+    def image_manifest(self, image: str) -> Optional[Dict[str, Any]]:
+        """Vrátí manifest image z repos/<repo>/<tag>/manifest (udocker ho ukládá před stažením vrstev)"""
+        repo, tag = image, 'latest'
+        if ':' in image.rsplit('/', 1)[-1]:
+            repo, tag = image.rsplit(':', 1)
+        
+        for candidate in (repo, f"library/{repo}"):
+            try:
+                with open(self.repos_dir / candidate / tag / 'manifest', 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                continue
+        return None
+    
+    def layer_size(self, digest: str) -> int:
+        """Vrátí aktuální velikost souboru vrstvy (během stahování roste)"""
+        try:
+            return os.stat(self.layers_dir / digest).st_size
+        except OSError:
+            return 0
+
+READ_BACKENDS = {
+    CliBackend.name: CliBackend,
+    FileBackend.name: FileBackend,
+}
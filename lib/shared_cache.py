@@ -0,0 +1,117 @@
+"""Snapshot cache sdílená mezi procesy (více workerů gunicornu)"""
+
+import os
+import mmap
+import time
+import fcntl
+import pickle
+import struct
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional
+from lib.fileutil import file_lock, write_atomic
+
+# Hlavička sdíleného souboru: generace, počet invalidací (2 x uint64)
+HEADER = struct.Struct('<QQ')
+
+class SharedStateCache:
+    """Stejné rozhraní jako StateCache, data ale leží v adresáři sdíleném všemi workery
+    
+    Generace je v mmapovaném souboru - invalidace jednoho workeru okamžitě vidí
+    ostatní. Každý záznam je soubor s (generace, čas, výsledek). Načítání stejného
+    klíče je serializované zámkem (fcntl), takže N workerů spustí jen jeden proces udockeru.
+    """
+    
+    def __init__(self, cache_dir: Path, ttl: float = 5.0):
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        self._fd = os.open(self.cache_dir / 'generation', os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < HEADER.size:
+            os.ftruncate(self._fd, HEADER.size)
+        self._mm = mmap.mmap(self._fd, HEADER.size)
+    
+    @property
+    def generation(self) -> int:
+        return HEADER.unpack_from(self._mm, 0)[0]
+    
+    @property
+    def invalidations(self) -> int:
+        return HEADER.unpack_from(self._mm, 0)[1]
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / (hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + '.entry')
+    
+    def _read_entry(self, path: Path, generation: int) -> Optional[Dict[str, Any]]:
+        """Vrátí platný záznam (stejná generace, mladší než TTL), jinak None"""
+        try:
+            with open(path, 'rb') as f:
+                entry_generation, stamp, result = pickle.load(f)
+        except Exception:
+            return None
+        if entry_generation != generation or time.time() - stamp >= self.ttl:
+            return None
+        return result
+    
+    def _write_entry(self, path: Path, generation: int, stamp: float, result: Dict[str, Any]):
+        try:
+            write_atomic(path, pickle.dumps((generation, stamp, result), protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            print(f"Chyba při zápisu sdílené cache: {e}")
+    
+    def get_or_load(self, key: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Vrátí výsledek ze sdílené cache, nebo ho načte loaderem (jen jeden proces najednou)"""
+        path = self._entry_path(key)
+        result = self._read_entry(path, self.generation)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+        
+        with file_lock(path.with_suffix('.lock')):
+            # Mezitím mohl výsledek načíst jiný worker
+            generation = self.generation
+            result = self._read_entry(path, generation)
+            if result is not None:
+                with self._lock:
+                    self.hits += 1
+                return result
+            
+            with self._lock:
+                self.misses += 1
+            stamp = time.time()
+            result = loader()
+            # Neuložit výsledek, který vznikl před invalidací
+            if result.get('success') and self.ttl > 0 and generation == self.generation:
+                self._write_entry(path, generation, stamp, result)
+            return result
+    
+    def invalidate(self):
+        """Zvýší sdílenou generaci - staré záznamy tím přestanou platit ve všech workerech"""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            generation, invalidations = HEADER.unpack_from(self._mm, 0)
+            HEADER.pack_into(self._mm, 0, generation + 1, invalidations + 1)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Počítadla zásahů cache (hits/misses za tento proces, ostatní sdílené)"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'ttl': self.ttl,
+            'shared': True,
+            'pid': os.getpid(),
+            'entries': sum(1 for _ in self.cache_dir.glob('*.entry')),
+            'hits': hits,
+            'misses': misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(hits / total, 3) if total else 0.0
+        }
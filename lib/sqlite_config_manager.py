@@ -0,0 +1,110 @@
+"""Správa konfigurace kontejnerů v SQLite (pro hosty s velkým počtem kontejnerů)"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any
+from lib.config_manager import ConfigManager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS containers (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    image TEXT,
+    autostart INTEGER NOT NULL DEFAULT 0,
+    config TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_containers_name ON containers(name);
+CREATE INDEX IF NOT EXISTS idx_containers_image ON containers(image);
+CREATE INDEX IF NOT EXISTS idx_containers_autostart ON containers(autostart);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class SQLiteConfigManager(ConfigManager):
+    """Stejné API jako ConfigManager, kontejnery ale drží v SQLite (WAL) s indexy
+    
+    Sekce 'settings' zůstává v config.yaml (upravuje ji administrátor ručně).
+    Kontejnery z config.yaml se při prvním spuštění jednorázově převezmou do databáze;
+    config.yaml se přitom nemění a zůstává jako záloha.
+    """
+    
+    def __init__(self, config_dir: Path = None, db_name: str = 'config.db'):
+        super().__init__(config_dir)
+        self.db_file = self.config_dir / db_name
+        self._local = threading.local()
+        
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+        self._migrate_from_yaml()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Vrátí připojení pro aktuální vlákno (sqlite3 připojení nelze sdílet mezi vlákny)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def _migrate_from_yaml(self):
+        """Jednorázově převezme kontejnery z config.yaml"""
+        with self._file_lock(), self._connection() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_yaml'").fetchone():
+                return
+            
+            containers = super().get_all_containers()
+            for container_id, container_config in containers.items():
+                self._upsert(conn, container_id, container_config)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_yaml', ?)",
+                         (str(len(containers)),))
+            if containers:
+                print(f"Převzato {len(containers)} kontejnerů z {self.config_file} do {self.db_file}")
+    
+    def _upsert(self, conn: sqlite3.Connection, container_id: str, container_config: Dict[str, Any]):
+        conn.execute(
+            """INSERT INTO containers (id, name, image, autostart, config) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET name = excluded.name, image = excluded.image,
+               autostart = excluded.autostart, config = excluded.config""",
+            (container_id, container_config.get('name', container_id), container_config.get('image'),
+             1 if container_config.get('autostart') else 0, json.dumps(container_config))
+        )
+    
+    def load_config(self) -> Dict[str, Any]:
+        """Vrátí konfiguraci ve stejném tvaru jako YAML verze (kontejnery z databáze)"""
+        config = super().load_config()
+        config['containers'] = self.get_all_containers()
+        return config
+    
+    # --- Metody volané z container_manager.py ---
+    
+    def get_all_containers(self) -> Dict[str, Dict[str, Any]]:
+        """Vrátí slovník všech kontejnerů (v pořadí vložení)."""
+        rows = self._connection().execute('SELECT id, config FROM containers ORDER BY rowid')
+        return {container_id: json.loads(config) for container_id, config in rows}
+    
+    def get_container_config(self, container_id: str) -> Dict[str, Any]:
+        """Vrátí konfiguraci konkrétního kontejneru (vyhledání podle primárního klíče)."""
+        row = self._connection().execute('SELECT config FROM containers WHERE id = ?',
+                                         (container_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+    
+    def get_autostart_containers(self) -> Dict[str, Dict[str, Any]]:
+        """Vrátí kontejnery s autostartem (index na autostart)."""
+        rows = self._connection().execute(
+            'SELECT id, config FROM containers WHERE autostart = 1 ORDER BY rowid')
+        return {container_id: json.loads(config) for container_id, config in rows}
+    
+    def save_container_config(self, container_id: str, container_config: Dict[str, Any]):
+        """Uloží/Aktualizuje konfiguraci kontejneru."""
+        with self._connection() as conn:
+            self._upsert(conn, container_id, container_config)
+    
+    def delete_container_config(self, container_id: str):
+        """Smaže konfiguraci kontejneru."""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM containers WHERE id = ?', (container_id,))
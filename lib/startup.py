@@ -0,0 +1,171 @@
+"""Sladění stavu po startu (sync + autostart) na pozadí, aby web běžel okamžitě"""
+
+import os
+import json
+import time
+import fcntl
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from lib.container_manager import ContainerManager
+from lib.fileutil import write_atomic
+
+class StartupTask:
+    """Jednorázová úloha po startu serveru: synchronizace a autostart kontejnerů
+    
+    S více workery (gunicorn) ji spustí jen jeden z nich (start_once); průběh zapisuje
+    do status_file, odkud ho čtou ostatní workery.
+    """
+    
+    def __init__(self, container_manager: ContainerManager, autostart_workers: int = 4,
+                 status_dir: Path = None):
+        self.container_manager = container_manager
+        self.autostart_workers = autostart_workers
+        self.phase = 'pending'  # pending -> sync -> autostart -> done / failed (not_started = nikdo ji nespustil)
+        self.error: Optional[str] = None
+        self.started = None
+        self.finished = None
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+        
+        # Režim více workerů
+        self.status_file = Path(status_dir) / 'startup.json' if status_dir else None
+        self.lock_file = Path(status_dir) / '.startup.lock' if status_dir else None
+        self.leader: Optional[bool] = None  # None = jediný proces
+        self.group: Optional[str] = None
+        self._lock_fd = None
+    
+    @property
+    def ready(self) -> bool:
+        return self.to_dict()['ready']
+    
+    def start(self):
+        """Spustí úlohu ve vlákně na pozadí (opakované volání nic nedělá)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name='startup')
+        self._thread.start()
+    
+    def start_once(self, group: str):
+        """Spustí úlohu jen v jednom workeru ze skupiny (group = PID master procesu)"""
+        self.group = group
+        self._try_lead()
+    
+    def _try_lead(self) -> bool:
+        """Pokusí se stát vedoucím workerem; převezme i úlohu, jejíž vedoucí worker zemřel"""
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            self.leader = False
+            return False
+        
+        # Zámek drží worker po celou dobu života; dokončenou úlohu náhradní worker znovu nespouští
+        self._lock_fd = fd
+        status = self._read_status()
+        if status is not None and (status['ready'] or _pid_alive(status.get('leader_pid'))):
+            self.leader = False
+            return False
+        if status is not None:
+            print(f"Vedoucí worker (pid {status.get('leader_pid')}) skončil ve fázi {status['phase']}, "
+                  f"přebírám start")
+        self.leader = True
+        self._save_status()
+        self.start()
+        return True
+    
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+    
+    def _run(self):
+        self.started = time.time()
+        try:
+            self.phase = 'sync'
+            self._save_status()
+            print("\n🔄 Synchronizuji kontejnery...")
+            self.container_manager.sync_running_containers()
+            
+            self.phase = 'autostart'
+            self._save_status()
+            print("\n🚀 Autostart kontejnery...")
+            results = self.container_manager.autostart_all(workers=self.autostart_workers,
+                                                           on_progress=self._save_status)
+            if results:
+                runner = self.container_manager.last_autostart
+                for entry in runner.report.values():
+                    print(f"  {'✓' if entry['success'] else '✗'} {entry['name']} "
+                          f"({entry['duration']:.1f} s, čekal {entry['waited']:.1f} s)")
+                print(f"  Celkem {len(results)} kontejnerů za {runner.elapsed:.1f} s")
+            else:
+                print("  (žádné)")
+            self.phase = 'done'
+        except Exception as e:
+            self.phase = 'failed'
+            self.error = str(e)
+            print(f"Chyba při startu kontejnerů: {e}")
+        finally:
+            self.finished = time.time()
+            self._done.set()
+            self._save_status()
+    
+    def _save_status(self):
+        """Zapíše stav pro ostatní workery (jen vedoucí worker)"""
+        if not self.leader:
+            return
+        data = {'group': self.group, 'leader_pid': os.getpid(), **self._local_status()}
+        try:
+            write_atomic(self.status_file, json.dumps(data).encode('utf-8'))
+        except Exception as e:
+            print(f"Chyba při zápisu stavu startu: {e}")
+    
+    def _read_status(self) -> Optional[Dict[str, Any]]:
+        """Stav zapsaný vedoucím workerem stejné skupiny (None = zatím nic)"""
+        try:
+            with open(self.status_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.pop('group', None) != self.group:
+            return None
+        return data
+    
+    def _local_status(self) -> Dict[str, Any]:
+        runner = self.container_manager.last_autostart
+        return {
+            'ready': self._done.is_set(),
+            'phase': self.phase,
+            'error': self.error,
+            'started': self.started,
+            'finished': self.finished,
+            'autostart': runner.progress() if runner is not None else None
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        if self.leader is False:
+            status = self._read_status()
+            # Vedoucí worker zemřel před dokončením - úlohu převezme tento worker
+            if status is not None and not status['ready'] and not _pid_alive(status.get('leader_pid')) \
+                    and self._lock_fd is None and self._try_lead():
+                return self._local_status()
+            if status is None:
+                status = {'ready': False, 'phase': 'pending', 'error': None, 'started': None,
+                          'finished': None, 'autostart': None}
+            status['worker'] = 'follower'
+            return status
+        if self.leader is None and self._thread is None:
+            # Spuštění mimo __main__ a gunicorn (např. flask run) - úlohu nikdo nenaplánoval,
+            # čekání na ni by trvalo navždy
+            return {**self._local_status(), 'ready': True, 'phase': 'not_started'}
+        return self._local_status()
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
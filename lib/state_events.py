@@ -0,0 +1,137 @@
+"""Sdílené sledování stavu kontejnerů a images - změny se rozesílají všem připojeným klientům"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterator
+from lib.container_manager import ContainerManager
+
+class StateEvents:
+    """Jedna smyčka na pozadí porovnává po sobě jdoucí snapshoty a publikuje jen rozdíly
+    
+    Smyčka běží, jen dokud je připojený aspoň jeden odběratel. Po zneplatnění
+    cache udockeru (akce v manageru, skončení procesu) se snapshot pořídí hned.
+    """
+    
+    def __init__(self, container_manager: ContainerManager, interval: float = 2.0, history: int = 1000):
+        self.container_manager = container_manager
+        self.interval = interval
+        self.ticks = 0
+        self._events = deque(maxlen=history)  # (pořadové číslo, událost)
+        self._seq = 0
+        self._subscribers = 0
+        self._thread: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._containers: Optional[Dict[str, Dict[str, Any]]] = None
+        self._images: Optional[Dict[str, Dict[str, Any]]] = None
+        self._containers_etag = None
+        self._images_etag = None
+        container_manager.udocker.invalidate_listeners.append(self.poke)
+    
+    def poke(self):
+        """Probudí smyčku, aby pořídila snapshot hned"""
+        self._wake.set()
+    
+    def subscribe(self, keepalive: float = 15) -> Iterator[Optional[Dict[str, Any]]]:
+        """Vrací události od okamžiku připojení (None = keepalive)"""
+        with self._cond:
+            self._subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='state-events')
+                self._thread.start()
+            index = self._seq
+        
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq > index, keepalive)
+                    if self._events and self._events[0][0] > index + 1:
+                        # Klient nestíhal a část historie už byla zahozena
+                        pending = [{'type': 'resync'}]
+                    else:
+                        pending = [event for seq, event in self._events if seq > index]
+                    index = self._seq
+                
+                if not pending:
+                    yield None
+                for event in pending:
+                    yield event
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+    
+    def _publish(self, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        with self._cond:
+            for event in events:
+                self._seq += 1
+                self._events.append((self._seq, event))
+            self._cond.notify_all()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._subscribers == 0:
+                    self._thread = None
+                    return
+            # Zneplatnění během snapshotu vyvolá další snapshot hned
+            self._wake.clear()
+            try:
+                self._tick()
+            except Exception as e:
+                print(f"Chyba při sledování stavu: {e}")
+            self._wake.wait(self.interval)
+    
+    def _tick(self):
+        """Pořídí snapshot a publikuje změny oproti předchozímu"""
+        self.ticks += 1
+        containers, containers_etag = self.container_manager.containers_state()
+        images_list, images_etag = self.container_manager.images_state()
+        images = {img['full_name']: img for img in images_list}
+        etags = {'containers_etag': containers_etag, 'images_etag': images_etag}
+        
+        if self._containers is None:
+            # První snapshot - klienti si stav dotáhnou podmíněným dotazem
+            self._containers, self._images = containers, images
+            self._containers_etag, self._images_etag = containers_etag, images_etag
+            self._publish([{'type': 'resync', **etags}])
+            return
+        
+        events = []
+        if containers_etag != self._containers_etag:
+            events += _diff(self._containers, containers, 'container', _container_change)
+        if images_etag != self._images_etag:
+            events += _diff(self._images, images, 'image',
+                            lambda old, new: 'image_pulled' if old is None else None,
+                            deleted='image_deleted')
+        
+        self._containers, self._images = containers, images
+        self._containers_etag, self._images_etag = containers_etag, images_etag
+        for event in events:
+            event.update(etags)
+            event['time'] = time.time()
+        self._publish(events)
+
+def _container_change(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Optional[str]:
+    """Typ změny kontejneru (None = beze změny)"""
+    if old is None:
+        return 'created'
+    if old == new:
+        return None
+    if old.get('running') != new.get('running'):
+        return 'started' if new.get('running') else 'stopped'
+    return 'updated'
+
+def _diff(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]], field: str,
+          change, deleted: str = 'deleted') -> List[Dict[str, Any]]:
+    """Porovná dva snapshoty (klíč -> položka) a vrátí seznam událostí"""
+    events = []
+    for position, (key, item) in enumerate(new.items()):
+        kind = change(old.get(key), item)
+        if kind is not None:
+            events.append({'type': kind, 'key': key, 'position': position, field: item})
+    for key in old.keys() - new.keys():
+        events.append({'type': deleted, 'key': key})
+    return events
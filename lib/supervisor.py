@@ -0,0 +1,309 @@
+"""Dohled nad procesy spuštěných kontejnerů (udocker run)"""
+
+import os
+import re
+import time
+import signal
+import socket
+import subprocess
+import threading
+from typing import List, Dict, Any, Optional, Callable, Tuple, Set
+
+class ManagedProcess:
+    """Záznam o jednom spuštěném kontejneru"""
+    
+    def __init__(self, container_id: str, process: subprocess.Popen, args: List[str]):
+        self.container_id = container_id
+        self.process = process
+        self.pid = process.pid
+        self.args = args
+        self.started = time.time()
+        self.exited = None
+        self.returncode = None
+        self.ready = False
+        self._ready_pattern = None
+        self._ready_event = threading.Event()
+        self._exit_event = threading.Event()
+    
+    @property
+    def alive(self) -> bool:
+        return self.returncode is None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'container_id': self.container_id,
+            'pid': self.pid,
+            'alive': self.alive,
+            'ready': self.ready,
+            'started': self.started,
+            'exited': self.exited,
+            'returncode': self.returncode
+        }
+
+class ProcessSupervisor:
+    """Drží handly procesů, sbírá ukončené potomky a zjišťuje připravenost kontejnerů"""
+    
+    def __init__(self, on_exit: Callable[[ManagedProcess], None] = None):
+        self.on_exit = on_exit
+        self._processes: Dict[str, ManagedProcess] = {}
+        self._lock = threading.Lock()
+    
+    def spawn(self, container_id: str, args: List[str], ready_log: str = None,
+              log=None, poll: float = 0.2) -> ManagedProcess:
+        """Spustí proces na pozadí v nové session a začne ho sledovat
+        
+        Výstup jde přímo do souboru logu (log.path), ne přes rouru - proces tak přežije
+        restart nebo ukončení manageru. Připravenost (ready_log) se hledá čtením konce souboru.
+        """
+        offset = 0
+        if log is not None:
+            log.path.parent.mkdir(parents=True, exist_ok=True)
+            output = open(log.path, 'ab')
+            offset = output.tell()
+        else:
+            output = open(os.devnull, 'wb')
+        
+        try:
+            process = subprocess.Popen(
+                args,
+                stdout=output,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                start_new_session=True,  # Oddělí proces od terminálu i od manageru
+                cwd=os.path.expanduser('~')
+            )
+        finally:
+            # Deskriptor drží potomek, manager ho nepotřebuje
+            output.close()
+        
+        managed = ManagedProcess(container_id, process, args)
+        if ready_log:
+            managed._ready_pattern = re.compile(ready_log)
+        
+        with self._lock:
+            self._processes[container_id] = managed
+        
+        threading.Thread(target=self._watch, args=(managed, log, offset, poll), daemon=True,
+                         name=f"supervisor-{container_id}").start()
+        return managed
+    
+    def _watch(self, managed: ManagedProcess, log, offset: int, poll: float):
+        """Čte konec logu (kontrola připravenosti, rotace) a po skončení procesu zaznamená exit code"""
+        tail = None
+        pending = b''
+        while True:
+            try:
+                managed.returncode = managed.process.wait(timeout=poll)
+            except subprocess.TimeoutExpired:
+                pass
+            
+            if log is not None:
+                try:
+                    log.rotate_external()
+                except Exception as e:
+                    print(f"Chyba při rotaci logu {managed.container_id}: {e}")
+            
+            if managed._ready_pattern is not None and not managed._ready_event.is_set() and log is not None:
+                try:
+                    if tail is None:
+                        tail = open(log.path, 'rb')
+                        tail.seek(offset)
+                    # Soubor byl zrotován (zkrácen) - číst znovu od začátku
+                    if os.fstat(tail.fileno()).st_size < tail.tell():
+                        tail.seek(0)
+                        pending = b''
+                    pending += tail.read()
+                    *lines, pending = pending.split(b'\n')
+                    if managed.returncode is not None and pending:
+                        lines.append(pending)
+                    for line in lines:
+                        if managed._ready_pattern.search(line.decode('utf-8', errors='replace')):
+                            managed._ready_event.set()
+                            break
+                except OSError:
+                    pass
+            
+            if managed.returncode is not None:
+                break
+        
+        if tail is not None:
+            tail.close()
+        managed.exited = time.time()
+        managed.ready = False
+        managed._exit_event.set()
+        print(f"Kontejner {managed.container_id} (pid {managed.pid}) skončil s kódem {managed.returncode}")
+        
+        if self.on_exit is not None:
+            try:
+                self.on_exit(managed)
+            except Exception as e:
+                print(f"Chyba v on_exit pro {managed.container_id}: {e}")
+    
+    def wait_ready(self, managed: ManagedProcess, ready_port: int = None,
+                   timeout: float = 30, grace: float = 0.5) -> Tuple[bool, str]:
+        """Počká, až proces běží a (volitelně) poslouchá na portu nebo vypíše daný řádek logu"""
+        deadline = time.monotonic() + timeout
+        
+        # Proces, který hned spadne, skončí během krátké ochranné doby
+        if managed._exit_event.wait(grace):
+            if managed.returncode == 0:
+                return True, f"Kontejner {managed.container_id} doběhl (exit code: 0)"
+            return False, f"Kontejner se nepodařilo spustit (exit code: {managed.returncode})"
+        
+        while True:
+            port_ok = ready_port is None or _port_open(ready_port)
+            log_ok = managed._ready_pattern is None or managed._ready_event.is_set()
+            if port_ok and log_ok:
+                managed.ready = True
+                return True, f"Kontejner {managed.container_id} připraven"
+            
+            if managed._exit_event.is_set():
+                return False, f"Kontejner skončil před připraveností (exit code: {managed.returncode})"
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False, f"Kontejner {managed.container_id} není připraven ani po {timeout:.0f} s"
+            
+            # Čekat na řádek logu nebo skončení procesu, port kontrolovat v intervalu
+            if managed._ready_pattern is not None and ready_port is None:
+                managed._ready_event.wait(min(remaining, 0.5))
+            else:
+                managed._exit_event.wait(min(remaining, 0.2))
+    
+    def stop(self, container_id: str, grace: float = 10) -> Tuple[bool, str]:
+        """Ukončí skupinu procesů kontejneru: SIGTERM, po uplynutí grace SIGKILL"""
+        managed = self.get(container_id)
+        if managed is not None and managed.alive:
+            pgids = [managed.pid]
+        else:
+            # Kontejner spuštěný mimo manager (nebo před jeho restartem)
+            pgids = sorted({_pgid(pid) for pid in find_run_pids(container_id)} - {None} - _own_pgids())
+        
+        if not pgids:
+            return False, f"Kontejner {container_id} neběží"
+        
+        _signal_groups(pgids, signal.SIGTERM)
+        deadline = time.monotonic() + grace
+        while time.monotonic() < deadline:
+            if managed is not None and managed.alive:
+                if managed._exit_event.wait(0.1):
+                    break
+            elif not any(_group_alive(pgid) for pgid in pgids):
+                break
+            else:
+                time.sleep(0.1)
+        else:
+            _signal_groups(pgids, signal.SIGKILL)
+            if managed is not None:
+                managed._exit_event.wait(2)
+            return True, f"Kontejner {container_id} zastaven (SIGKILL po {grace:.0f} s)"
+        
+        return True, f"Kontejner {container_id} zastaven"
+    
+    def get(self, container_id: str) -> Optional[ManagedProcess]:
+        with self._lock:
+            return self._processes.get(container_id)
+    
+    def is_running(self, container_id: str) -> bool:
+        managed = self.get(container_id)
+        return managed is not None and managed.alive
+    
+    def running(self) -> Set[str]:
+        """Kontejnery s živým procesem spuštěným tímto managerem"""
+        with self._lock:
+            return {container_id for container_id, p in self._processes.items() if p.alive}
+    
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [p.to_dict() for p in self._processes.values()]
+
+# Volby 'udocker run', za kterými následuje hodnota jako samostatný argument
+RUN_OPTIONS_WITH_VALUE = {'-v', '-p', '-e', '-w', '-u', '-h', '--volume', '--publish', '--env',
+                          '--workdir', '--user', '--hostname', '--entrypoint', '--name'}
+
+def _run_container_arg(argv: List[str]) -> Optional[str]:
+    """Vrátí kontejner z příkazu 'udocker run [volby] <kontejner> ...', jinak None"""
+    # udocker je skript - spuštěný přímo, nebo jako argument interpretu Pythonu
+    if argv and os.path.basename(argv[0]) in ('udocker', 'udocker.py'):
+        i = 0
+    elif len(argv) > 1 and os.path.basename(argv[0]).startswith('python') \
+            and os.path.basename(argv[1]) in ('udocker', 'udocker.py'):
+        i = 1
+    else:
+        return None
+    
+    rest = argv[i + 1:]
+    if not rest or rest[0] != 'run':
+        return None
+    j = 1
+    while j < len(rest):
+        if rest[j] in RUN_OPTIONS_WITH_VALUE:
+            j += 2
+        elif rest[j].startswith('-'):
+            j += 1
+        else:
+            return rest[j]
+    return None
+
+def _scan_run_processes() -> Dict[str, List[int]]:
+    """Jeden průchod /proc: kontejner -> PID procesů 'udocker run' (kromě manageru samotného)"""
+    processes: Dict[str, List[int]] = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return processes
+    
+    own = {os.getpid(), os.getppid()}
+    for entry in entries:
+        if not entry.isdigit() or int(entry) in own:
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                argv = [a.decode('utf-8', errors='replace') for a in f.read().split(b'\0') if a]
+        except OSError:
+            continue
+        
+        container = _run_container_arg(argv)
+        if container is not None:
+            processes.setdefault(container, []).append(int(entry))
+    return processes
+
+def find_run_pids(container_id: str) -> List[int]:
+    """Najde procesy 'udocker run ... <container_id>' podle /proc/<pid>/cmdline (přesná shoda kontejneru)"""
+    return _scan_run_processes().get(container_id, [])
+
+def running_containers() -> Set[str]:
+    """Kontejnery, pro které v systému běží 'udocker run' (i spuštěné jiným procesem)"""
+    return set(_scan_run_processes())
+
+def _own_pgids() -> set:
+    """Skupiny procesů manageru (vlastní a rodičovská) - ty se nikdy nesignalizují"""
+    return {_pgid(0), _pgid(os.getppid())} - {None}
+
+def _pgid(pid: int) -> Optional[int]:
+    try:
+        return os.getpgid(pid)
+    except OSError:
+        return None
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except OSError:
+        return False
+
+def _signal_groups(pgids: List[int], sig: int):
+    for pgid in pgids:
+        try:
+            os.killpg(pgid, sig)
+        except OSError:
+            pass
+
+def _port_open(port: int, host: str = '127.0.0.1') -> bool:
+    """Zjistí, zda na portu někdo naslouchá"""
+    try:
+        with socket.create_connection((host, int(port)), timeout=0.2):
+            return True
+    except OSError:
+        return False
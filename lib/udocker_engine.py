@@ -0,0 +1,227 @@
+"""Dlouhodobě běžící pomocný proces, který drží udocker moduly načtené v paměti
+
+Místo spouštění nového interpretu pro každý krátký příkaz (ps, inspect, images)
+se příkazy posílají jako JSON řádky do malé skupiny workerů, které volají přímo UMain
+z udockeru. Worker je oddělený proces, protože udocker mění globální stav
+(sys.exit, Msg, pracovní adresář) a nesmí tak ovlivnit Flask aplikaci.
+"""
+
+import os
+import io
+import sys
+import json
+import queue
+import shutil
+import select
+import subprocess
+import threading
+import contextlib
+from typing import List, Dict, Any, Optional
+
+# Příkazy, které lze bezpečně vykonat ve workeru (krátké, bez interaktivního výstupu).
+# create/rm/rmi mohou trvat dlouho (rozbalení nebo mazání velkého image) - běží
+# v samostatném procesu, aby neblokovaly workery pro ps/inspect/images.
+WORKER_COMMANDS = {'version', 'ps', 'images', 'inspect', 'name', 'rmname'}
+
+class _Worker:
+    """Jeden proces workeru - vykonává vždy jen jeden příkaz"""
+    
+    def __init__(self, udocker_cmd: str, startup_timeout: float):
+        self.udocker_cmd = udocker_cmd
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+    
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+    
+    def start(self) -> Optional[str]:
+        """Spustí worker a počká na potvrzení, že se udocker podařilo naimportovat (vrací chybu)"""
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), self.udocker_cmd],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                cwd=os.path.expanduser('~')
+            )
+        except Exception as e:
+            return str(e)
+        
+        hello = self._read_reply(self.startup_timeout)
+        if not hello or not hello.get('ready'):
+            self.kill()
+            return (hello or {}).get('error', 'Worker neodpověděl')
+        return None
+    
+    def kill(self):
+        if self.process is not None:
+            try:
+                self.process.kill()
+                self.process.wait(timeout=5)
+            except Exception:
+                pass
+        self.process = None
+    
+    def _read_reply(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Přečte jeden JSON řádek z workeru, nejdéle timeout sekund"""
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            return None
+        line = self.process.stdout.readline()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    
+    def execute(self, args: List[str], timeout: int) -> Dict[str, Any]:
+        try:
+            self.process.stdin.write(json.dumps({'args': args}) + '\n')
+            self.process.stdin.flush()
+        except OSError as e:
+            self.kill()
+            return {'success': False, 'stdout': '', 'stderr': str(e), 'returncode': -1}
+        
+        reply = self._read_reply(timeout)
+        if reply is None:
+            # Worker se zasekl nebo spadl - příště se spustí znovu
+            self.kill()
+            return {'success': False, 'stdout': '', 'stderr': 'Timeout', 'returncode': -1}
+        
+        returncode = reply.get('returncode', -1)
+        return {
+            'success': returncode == 0,
+            'stdout': reply.get('stdout', ''),
+            'stderr': reply.get('stderr', ''),
+            'returncode': returncode
+        }
+
+class WorkerEngine:
+    """Vykonává udocker příkazy ve skupině dlouhodobě běžících workerů (spouštěných podle potřeby)"""
+    
+    def __init__(self, udocker_cmd: str = 'udocker', workers: int = 4, startup_timeout: float = 30):
+        self.udocker_cmd = udocker_cmd
+        self.startup_timeout = startup_timeout
+        self.workers = max(1, workers)
+        self.available = True
+        self.error = ''
+        self._idle: 'queue.LifoQueue[_Worker]' = queue.LifoQueue()
+        self._all: List[_Worker] = []
+        self._lock = threading.Lock()
+    
+    def supports(self, args: List[str]) -> bool:
+        """Zda lze příkaz vykonat ve workeru"""
+        return self.available and bool(args) and args[0] in WORKER_COMMANDS
+    
+    def _acquire(self) -> _Worker:
+        """Volný worker; nový se vytvoří, dokud jich není plný počet, jinak se čeká"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.workers:
+                worker = _Worker(self.udocker_cmd, self.startup_timeout)
+                self._all.append(worker)
+                return worker
+        return self._idle.get()
+    
+    def _disable(self, error: str):
+        """Trvale vypne workery - wrapper se vrátí ke spouštění CLI"""
+        print(f"udocker worker nedostupný, používám CLI: {error}")
+        self.available = False
+        self.error = error
+        self.close()
+    
+    def execute(self, args: List[str], timeout: int = 30) -> Dict[str, Any]:
+        """Vykoná příkaz ve volném workeru a vrátí výsledek ve stejném tvaru jako run_command"""
+        worker = self._acquire()
+        try:
+            if not worker.alive:
+                error = worker.start()
+                if error is not None:
+                    self._disable(error)
+                    return {'success': False, 'stdout': '', 'stderr': error, 'returncode': -1}
+            return worker.execute(args, timeout)
+        finally:
+            self._idle.put(worker)
+    
+    def close(self):
+        """Ukončí všechny workery"""
+        with self._lock:
+            workers = list(self._all)
+        for worker in workers:
+            worker.kill()
+
+def _import_umain(udocker_cmd: str):
+    """Naimportuje udocker.umain - z nainstalovaného balíku nebo z adresáře vedle spustitelného souboru"""
+    try:
+        from udocker.umain import UMain
+        return UMain
+    except ImportError:
+        pass
+    
+    # Instalace z tarballu: udocker -> .../udocker/maincmd.py
+    executable = shutil.which(udocker_cmd)
+    if executable:
+        real = os.path.realpath(executable)
+        if os.path.basename(real) == 'maincmd.py':
+            sys.path.insert(0, os.path.dirname(os.path.dirname(real)))
+    
+    from udocker.umain import UMain
+    return UMain
+
+def _worker_main(udocker_cmd: str):
+    """Smyčka workeru: čte JSON příkazy ze stdin a odpovídá JSON řádky"""
+    # Protokol jde přes kopii původního stdout, fd 1 se přesměruje do /dev/null,
+    # aby případný výstup udockeru na úrovni fd nerozbil odpovědi
+    proto = os.fdopen(os.dup(1), 'w')
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    
+    def reply(data: Dict[str, Any]):
+        proto.write(json.dumps(data) + '\n')
+        proto.flush()
+    
+    try:
+        UMain = _import_umain(udocker_cmd)
+    except Exception as e:
+        reply({'ready': False, 'error': f"Nelze načíst udocker: {e}"})
+        return
+    
+    home = os.getcwd()
+    reply({'ready': True})
+    
+    for line in sys.stdin:
+        try:
+            args = json.loads(line)['args']
+        except (ValueError, KeyError, TypeError):
+            reply({'returncode': -1, 'stdout': '', 'stderr': 'Neplatný požadavek'})
+            continue
+        
+        out, err = io.StringIO(), io.StringIO()
+        returncode = -1
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                returncode = UMain([udocker_cmd] + args).execute()
+        except SystemExit as e:
+            # sys.exit() / sys.exit(None) = úspěch, sys.exit("zpráva") = chyba
+            if e.code is None:
+                returncode = 0
+            elif isinstance(e.code, int):
+                returncode = e.code
+            else:
+                err.write(str(e.code))
+                returncode = 1
+        except Exception as e:
+            err.write(str(e))
+        finally:
+            os.chdir(home)
+        
+        reply({'returncode': returncode or 0, 'stdout': out.getvalue(), 'stderr': err.getvalue()})
+
+if __name__ == '__main__':
+    _worker_main(sys.argv[1] if len(sys.argv) > 1 else 'udocker')
@@ -1,16 +1,191 @@
 """Wrapper pro práci s udocker příkazy"""
 
 import subprocess
-import json
+import os
 import re
-from typing import List, Dict, Tuple, Any
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Any, Callable, Iterator, Optional
+from lib.read_backends import READ_BACKENDS, CliBackend, FileBackend
+from lib.udocker_engine import WorkerEngine
+from lib.supervisor import ProcessSupervisor, running_containers
+from lib.container_logs import ContainerLogs
+from lib.shared_cache import SharedStateCache
+from lib.image_index import ImageIndex
 
-class UDockerWrapper:
+class StateCache:
+    """Snapshot stavu udockeru (ps, ps -a, images, inspect) s TTL a explicitní invalidací"""
+    
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+    
+    def get_or_load(self, key: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Vrátí výsledek z cache, nebo ho načte loaderem (ukládají se jen úspěšné výsledky)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self.generation
+        
+        result = loader()
+        if result.get('success') and self.ttl > 0:
+            with self._lock:
+                # Neuložit výsledek, který vznikl před invalidací
+                if generation == self.generation:
+                    self._entries[key] = (now, result)
+        return result
+    
+    def invalidate(self):
+        """Zahodí celý snapshot - volá se po každé změně stavu"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Počítadla zásahů cache pro ověření efektu"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'ttl': self.ttl,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / total, 3) if total else 0.0
+            }
+
+def _format_size(size: float) -> str:
+    """Formátuje velikost v bajtech pro zobrazení"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+# Příkazy, které nemění stav - souběžná identická volání lze sdílet
+READ_ONLY_COMMANDS = {'version', 'ps', 'images', 'inspect'}
+
+class SingleFlight:
+    """Sdílí výsledek právě běžícího volání se všemi, kdo čekají na stejný klíč"""
+    
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error: Optional[BaseException] = None
+    
     def __init__(self):
+        self._calls: Dict[Any, 'SingleFlight._Call'] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+    
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """Zavolá fn, pokud pro klíč už neběží jiné volání; jinak počká na jeho výsledek"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.done.wait()
+            # Výjimka vedoucího volání platí i pro čekající (jinak by dostali None)
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.executed += 1
+            call.done.set()
+        return call.result
+
+class UDockerWrapper:
+    def __init__(self, cache_ttl: float = 5.0, read_backend: str = 'cli',
+                 inspect_workers: int = 8, engine: str = 'subprocess',
+                 log_dir: str = None, log_max_bytes: int = 10 * 1024 * 1024,
+                 shared_cache_dir: str = None, image_index_path: str = None):
         self.udocker_cmd = 'udocker'
+        self.inspect_workers = max(1, inspect_workers)
+        # Workerů stačí méně než vláken pro inspect - každý drží naimportovaný udocker
+        self.engine = WorkerEngine(self.udocker_cmd, workers=min(self.inspect_workers, 4)) \
+            if engine == 'worker' else None
+        # Více procesů (gunicorn workery) sdílí jednu cache přes adresář
+        if shared_cache_dir is not None:
+            self.cache = SharedStateCache(shared_cache_dir, cache_ttl)
+        else:
+            self.cache = StateCache(cache_ttl)
+        self.inflight = SingleFlight()
+        self.processes_spawned = 0
+        self.last_listing: Dict[str, Any] = {}
+        self._counter_lock = threading.Lock()
+        self.cli_backend = CliBackend(self)
+        self.set_read_backend(read_backend)
+        self.supervisor = ProcessSupervisor(on_exit=lambda managed: self.invalidate_cache())
+        self.logs = ContainerLogs(log_dir, max_bytes=log_max_bytes)
+        self.invalidate_listeners: List[Callable[[], None]] = []
+        # Které kontejnery používají který image (pro prune bez inspect všech kontejnerů)
+        self.image_index = ImageIndex(image_index_path) if image_index_path is not None else None
+    
+    def set_read_backend(self, name: str):
+        """Nastaví backend pro čtení stavu ('cli' nebo 'files')"""
+        if name not in READ_BACKENDS:
+            print(f"Neznámý read backend '{name}', používám 'cli'")
+            name = CliBackend.name
+        
+        if name == CliBackend.name:
+            self.read_backend = self.cli_backend
+        else:
+            self.read_backend = READ_BACKENDS[name]()
+    
+    def _read(self, method: str, *args) -> Any:
+        """Zavolá metodu read backendu; při selhání použije CLI jako zálohu"""
+        backend = self.read_backend
+        result = getattr(backend, method)(*args)
+        if result is None and backend is not self.cli_backend:
+            result = getattr(self.cli_backend, method)(*args)
+        return result
     
     def run_command(self, args: List[str], timeout: int = 30) -> Dict[str, Any]:
         """Spustí udocker příkaz a vrátí výsledek"""
+        if args and args[0] in READ_ONLY_COMMANDS:
+            # Identické read-only příkazy, které už běží, sdílí jeden proces
+            # (generace cache v klíči - po změně stavu se nepřipojí ke starému volání)
+            key = (self.cache.generation, tuple(args))
+            return self.inflight.do(key, lambda: self._execute(args, timeout))
+        return self._execute(args, timeout)
+    
+    def _execute(self, args: List[str], timeout: int) -> Dict[str, Any]:
+        """Vykoná příkaz přes worker nebo nový udocker proces"""
+        if self.engine is not None and self.engine.supports(args):
+            result = self.engine.execute(args, timeout=timeout)
+            # Pokud worker nejde spustit, pokračovat přes CLI
+            if self.engine.available:
+                return result
+        
+        with self._counter_lock:
+            self.processes_spawned += 1
         try:
             result = subprocess.run([self.udocker_cmd] + args, capture_output=True, 
                                    text=True, timeout=timeout)
@@ -25,88 +200,76 @@ class UDockerWrapper:
         except Exception as e:
             return {'success': False, 'stdout': '', 'stderr': str(e), 'returncode': -1}
     
+    def query(self, args: List[str]) -> Dict[str, Any]:
+        """Spustí read-only příkaz (ps, images, inspect) přes sdílený snapshot cache"""
+        return self.cache.get_or_load(' '.join(args), lambda: self.run_command(args))
+    
+    def invalidate_cache(self):
+        """Zneplatní snapshot stavu po změně kontejnerů nebo images"""
+        self.cache.invalidate()
+        for listener in self.invalidate_listeners:
+            listener()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Vrátí statistiky snapshot cache a posledního výpisu kontejnerů"""
+        stats = self.cache.stats()
+        stats['processes_spawned'] = self.processes_spawned
+        stats['coalesced'] = self.inflight.coalesced
+        stats['last_listing'] = dict(self.last_listing)
+        return stats
+    
     def check_installation(self) -> bool:
         """Zkontroluje, zda je udocker nainstalován"""
         return self.run_command(['version'])['success']
     
     def get_running_containers(self) -> List[Dict[str, str]]:
-        """Získá seznam běžících kontejnerů s jejich názvy a detaily"""
-        result = self.run_command(['ps'])
-        containers = []
+        """Získá seznam kontejnerů s detaily; 'running' podle živých procesů 'udocker run'
         
-        if result['success'] and result['stdout']:
-            lines = result['stdout'].strip().split('\n')
-            
-            # Zpracovat řádky s kontejnery
-            for line in lines:
-                if not line.strip() or 'CONTAINER ID' in line.upper():
-                    continue
-                    
-                parts = line.split()
-                if not parts or len(parts) < 2:
-                    continue
-                
-                container_id = parts[0]
-                
-                # Extrahovat název z hranatých závorek
-                # Formát: ['název']
-                name_match = re.search(r"\['([^']+)'\]", line)
-                if name_match:
-                    container_name = name_match.group(1)
-                else:
-                    # Pokud není v závorkách, použít ID
-                    container_name = container_id
-                
-                # Získat detaily pomocí inspect
-                inspect_info = self.inspect_container(container_name)
-                
-                containers.append({
-                    'id': container_id,
-                    'name': container_name,
-                    'running': True,
-                    'image': inspect_info.get('image', 'unknown'),
-                    'ports': inspect_info.get('ports', []),
-                    'volumes': inspect_info.get('volumes', []),
-                    'env': inspect_info.get('env', []),
-                    'command': inspect_info.get('command', '')
-                })
+        udocker ps vypisuje i zastavené kontejnery - běh se proto zjišťuje z procesů
+        (supervisor tohoto manageru, jinak /proc pro kontejnery spuštěné jinde).
+        """
+        live = self.supervisor.running() | running_containers()
+        return self.inspect_batch([{**entry, 'running': entry['id'] in live or entry['name'] in live}
+                                   for entry in self._read('list_containers', False) or []])
+    
+    def inspect_batch(self, entries: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Paralelně zjistí detaily kontejnerů z jednoho výpisu ps (IMAGE sloupec se použije znovu)"""
+        started = time.monotonic()
+        processes_before = self.processes_spawned
+        
+        def inspect_entry(entry: Dict[str, str]) -> Dict[str, Any]:
+            inspect_info = self.inspect_container(entry['name'], image_hint=entry.get('image'))
+            return {
+                'id': entry['id'],
+                'name': entry['name'],
+                'running': entry.get('running', True),
+                'image': inspect_info.get('image', 'unknown'),
+                'ports': inspect_info.get('ports', []),
+                'volumes': inspect_info.get('volumes', []),
+                'env': inspect_info.get('env', []),
+                'command': inspect_info.get('command', '')
+            }
+        
+        if len(entries) > 1 and self.inspect_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.inspect_workers, len(entries))) as pool:
+                containers = list(pool.map(inspect_entry, entries))
+        else:
+            containers = [inspect_entry(entry) for entry in entries]
         
+        self.last_listing = {
+            'containers': len(containers),
+            'processes': self.processes_spawned - processes_before,
+            'elapsed': round(time.monotonic() - started, 4)
+        }
         return containers
     
     def get_all_containers(self) -> List[Dict[str, str]]:
         """Získá seznam všech kontejnerů (běžících i zastavených)"""
-        result = self.run_command(['ps', '-a'])
-        containers = []
-        
-        if result['success'] and result['stdout']:
-            for line in result['stdout'].strip().split('\n'):
-                if not line.strip() or 'CONTAINER' in line.upper():
-                    continue
-                
-                parts = line.split()
-                if not parts:
-                    continue
-                
-                container_id = parts[0]
-                
-                # Extrahovat název z hranatých závorek
-                name_match = re.search(r"\['([^']+)'\]", line)
-                if name_match:
-                    container_name = name_match.group(1)
-                else:
-                    container_name = container_id
-                
-                containers.append({
-                    'id': container_id,
-                    'name': container_name
-                })
-        
-        return containers
+        return [{'id': c['id'], 'name': c['name']}
+                for c in self._read('list_containers', True) or []]
     
-    def inspect_container(self, container_name: str) -> Dict[str, Any]:
+    def inspect_container(self, container_name: str, image_hint: str = None) -> Dict[str, Any]:
         """Získá detailní informace o kontejneru pomocí udocker inspect"""
-        result = self.run_command(['inspect', container_name])
-        
         info = {
             'name': container_name,
             'image': 'unknown',
@@ -116,14 +279,11 @@ class UDockerWrapper:
             'command': ''
         }
         
-        if not result['success'] or not result['stdout']:
-            print(f"Inspect selhal pro {container_name}: {result.get('stderr', 'no output')}")
+        data = self._read('inspect', container_name)
+        if data is None:
             return info
         
         try:
-            # Parsovat JSON výstup
-            data = json.loads(result['stdout'])
-            
             print(f"\n=== Inspect výstup pro {container_name} ===")
             
             # Získat informace z config sekce
@@ -168,12 +328,20 @@ class UDockerWrapper:
                     print(f"  Volume: {vol_str}")
             
             # Zkusit získat image info
+            # Možnost 0: Přímo z backendu (imagerepo.name)
+            image = self._read('container_image', container_name)
+            if image:
+                info['image'] = image
+            elif image_hint:
+                # IMAGE sloupec z již načteného výpisu ps
+                info['image'] = image_hint
+            
             # Možnost 1: Ze source label
             labels = config.get('Labels', {})
             image_source = labels.get('org.opencontainers.image.source', '')
             image_version = labels.get('org.opencontainers.image.version', '')
             
-            if image_source and image_version:
+            if info['image'] == 'unknown' and image_source and image_version:
                 # Zkusit extrahovat repo name
                 repo_match = re.search(r'github\.com/([^/]+/[^/]+)', image_source)
                 if repo_match:
@@ -183,7 +351,7 @@ class UDockerWrapper:
             
             # Možnost 2: Zkusit udocker ps pro získání image
             if info['image'] == 'unknown':
-                ps_result = self.run_command(['ps'])
+                ps_result = self.query(['ps'])
                 if ps_result['success']:
                     for line in ps_result['stdout'].split('\n'):
                         if container_name in line:
@@ -201,9 +369,6 @@ class UDockerWrapper:
             
             print(f"=== Konec inspect pro {container_name} ===\n")
         
-        except json.JSONDecodeError as e:
-            print(f"Chyba při parsování JSON pro {container_name}: {e}")
-            print(f"Výstup: {result['stdout'][:200]}")
         except Exception as e:
             print(f"Chyba při zpracování inspect výstupu pro {container_name}: {e}")
             import traceback
@@ -213,29 +378,7 @@ class UDockerWrapper:
     
     def get_images(self) -> List[Dict[str, str]]:
         """Získá seznam lokálních images"""
-        result = self.run_command(['images'])
-        images = []
-        
-        if result['success'] and result['stdout']:
-            for line in result['stdout'].strip().split('\n')[1:]:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        repo = parts[0]
-                        tag = parts[1] if len(parts) > 1 else 'latest'
-                        
-                        # Sestavit celé jméno
-                        full_name = f"{repo}:{tag}"
-                        
-                        # Odstranit trailing dvojtečku pokud existuje
-                        full_name = full_name.rstrip(':')
-                        
-                        images.append({
-                            'repository': repo,
-                            'tag': tag,
-                            'full_name': full_name
-                        })
-        return images
+        return self._read('list_images') or []
     
     def image_exists(self, image: str) -> bool:
         """Kontrola, zda image existuje lokálně"""
@@ -248,17 +391,23 @@ class UDockerWrapper:
     def create_container(self, name: str, image: str) -> Tuple[bool, str]:
         """Vytvoří nový kontejner"""
         result = self.run_command(['create', f'--name={name}', image])
+        self.invalidate_cache()
         if result['success']:
+            if self.image_index is not None:
+                output = result['stdout'].split()
+                self.image_index.add(name, image, output[-1] if output else None)
             return True, f"Kontejner {name} vytvořen"
         return False, result['stderr'] or "Chyba při vytváření"
     
     def run_container(self, container_id: str, volumes: List[str] = None,
                      ports: List[str] = None, env: List[str] = None,
-                     command: str = None) -> Tuple[bool, str]:
-        """Spustí kontejner s parametry na pozadí"""
-        import subprocess
-        import os
+                     command: str = None, ready_port: int = None,
+                     ready_log: str = None, ready_timeout: float = 30) -> Tuple[bool, str]:
+        """Spustí kontejner s parametry na pozadí a počká na jeho připravenost
         
+        Připravenost = proces běží a volitelně naslouchá na ready_port
+        nebo vypsal řádek odpovídající regulárnímu výrazu ready_log.
+        """
         args = [self.udocker_cmd, 'run']
         
         if volumes:
@@ -281,100 +430,233 @@ class UDockerWrapper:
             args.extend(command.split())
         
         try:
-            # Spustit proces na pozadí pomocí subprocess.Popen
-            # Oddělit od terminálu a přesměrovat výstup
-            process = subprocess.Popen(
-                args,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                stdin=subprocess.DEVNULL,
-                start_new_session=True,  # Oddělí proces od terminálu
-                cwd=os.path.expanduser('~')
-            )
-            
-            # Počkat krátkou chvíli na kontrolu, zda proces nezhavaroval hned
-            import time
-            time.sleep(1)
-            
-            # Zkontrolovat, zda proces stále běží
-            poll = process.poll()
-            if poll is not None and poll != 0:
-                return False, f"Kontejner se nepodařilo spustit (exit code: {poll})"
-            
-            return True, f"Kontejner {container_id} spuštěn na pozadí"
+            # Spustit proces na pozadí pod dohledem supervisoru
+            managed = self.supervisor.spawn(container_id, args, ready_log=ready_log,
+                                            log=self.logs.log(container_id))
+            self.invalidate_cache()
             
+            success, message = self.supervisor.wait_ready(managed, ready_port=ready_port,
+                                                          timeout=ready_timeout)
+            if success and managed.alive:
+                return True, f"Kontejner {container_id} spuštěn na pozadí (pid {managed.pid})"
+            return success, message
+        
         except Exception as e:
             return False, f"Chyba při spouštění: {str(e)}"
     
-    def stop_container(self, container_id: str) -> Tuple[bool, str]:
-        """Zastaví a smaže běžící kontejner"""
-        # udocker nemá příkaz 'stop', použijeme 'rm' pro smazání
-        result = self.run_command(['rm', container_id])
-        if result['success']:
-            return True, f"Kontejner {container_id} zastaven a smazán"
-        return False, result['stderr'] or "Chyba při zastavování"
+    def get_container_logs(self, container_id: str, lines: int = 100) -> Tuple[bool, str]:
+        """Vrátí posledních N řádků zachyceného výstupu kontejneru"""
+        return self.logs.tail(container_id, max(1, min(lines, 10000)))
+    
+    def follow_container_logs(self, container_id: str, interval: float = 0.5) -> Iterator[Dict[str, Any]]:
+        """Sleduje nové řádky logu kontejneru (po dávkách)"""
+        return self.logs.follow(container_id, interval=interval)
+    
+    def process_status(self) -> List[Dict[str, Any]]:
+        """Vrátí stav procesů spuštěných kontejnerů (pid, start, exit code)"""
+        return self.supervisor.status()
+    
+    def stop_container(self, container_id: str, grace: float = 10) -> Tuple[bool, str]:
+        """Zastaví běžící kontejner - kontejner (rootfs) zůstává na disku pro rychlý restart"""
+        # udocker nemá příkaz 'stop', ukončí se skupina procesů 'udocker run'
+        success, message = self.supervisor.stop(container_id, grace=grace)
+        self.invalidate_cache()
+        return success, message
     
     def delete_container(self, container_id: str) -> Tuple[bool, str]:
         """Smaže kontejner"""
         result = self.run_command(['rm', container_id])
+        self.invalidate_cache()
         if result['success']:
+            if self.image_index is not None:
+                self.image_index.remove(container_id)
             return True, f"Kontejner {container_id} smazán"
         return False, result['stderr'] or "Chyba při mazání"
     
     def pull_image(self, image: str) -> Tuple[bool, str]:
         """Stáhne image z registru"""
-        result = self.run_command(['pull', image], timeout=600)
-        if result['success']:
+        final = {}
+        for event in self.pull_image_stream(image):
+            final = event
+        if final.get('success'):
             return True, f"Image {image} stažen"
-        return False, result['stderr'] or "Chyba při stahování"
+        return False, final.get('message') or "Chyba při stahování"
+    
+    def pull_image_stream(self, image: str, timeout: int = 600,
+                          interval: float = 0.5) -> Iterator[Dict[str, Any]]:
+        """Stáhne image a průběžně vrací události s postupem stahování
+        
+        Výstup udockeru se čte po řádcích (stdout i stderr). Skutečné počty bajtů
+        se zjišťují z manifestu v repos/ a velikostí souborů vrstev v layers/.
+        Poslední událost má phase='done' a klíče success a message.
+        """
+        files = self.read_backend if isinstance(self.read_backend, FileBackend) else FileBackend()
+        lines: queue.Queue = queue.Queue()
+        
+        with self._counter_lock:
+            self.processes_spawned += 1
+        try:
+            process = subprocess.Popen(
+                [self.udocker_cmd, 'pull', image],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+                cwd=os.path.expanduser('~')
+            )
+        except Exception as e:
+            yield {'phase': 'done', 'success': False, 'message': str(e)}
+            return
+        
+        def reader():
+            for line in process.stdout:
+                lines.put(line.rstrip())
+            lines.put(None)
+        
+        threading.Thread(target=reader, daemon=True).start()
+        yield {'phase': 'start', 'message': 'Připojuji se k registru...', 'progress': 1}
+        
+        deadline = time.monotonic() + timeout
+        layers: Dict[str, int] = {}
+        seen_layers: List[str] = []
+        output: List[str] = []
+        last_sample = None
+        finished = False
+        
+        try:
+            while not finished:
+                if time.monotonic() > deadline:
+                    process.kill()
+                    yield {'phase': 'done', 'success': False, 'message': 'Timeout'}
+                    return
+                
+                try:
+                    line = lines.get(timeout=interval)
+                except queue.Empty:
+                    line = ''
+                
+                if line is None:
+                    finished = True
+                elif line:
+                    output.append(line)
+                    digest_match = re.search(r'(sha256:[0-9a-f]{12,64})', line)
+                    if digest_match and 'download' in line.lower():
+                        digest = digest_match.group(1)
+                        if digest not in seen_layers:
+                            seen_layers.append(digest)
+                        yield {'phase': 'layer', 'layer': digest, 'message': line}
+                    else:
+                        yield {'phase': 'log', 'message': line}
+                
+                # Velikosti vrstev z manifestu (objeví se po jeho stažení)
+                if not layers:
+                    manifest = files.image_manifest(image) or {}
+                    for layer in manifest.get('layers', []):
+                        if layer.get('digest'):
+                            layers[layer['digest']] = int(layer.get('size') or 0)
+                
+                if layers:
+                    total = sum(layers.values())
+                    downloaded = sum(min(files.layer_size(d), size) for d, size in layers.items())
+                    done = sum(1 for d, size in layers.items() if size and files.layer_size(d) >= size)
+                    sample = (downloaded, done)
+                    if sample != last_sample:
+                        last_sample = sample
+                        yield {
+                            'phase': 'progress',
+                            'downloaded': downloaded,
+                            'total': total,
+                            'layers_done': done,
+                            'layers_total': len(layers),
+                            'progress': min(99, max(1, int(downloaded * 100 / total))) if total else 1,
+                            'message': (f"Stahuji vrstvy {done}/{len(layers)} – "
+                                        f"{_format_size(downloaded)} / {_format_size(total)}")
+                        }
+            
+            returncode = process.wait(timeout=max(1, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            yield {'phase': 'done', 'success': False, 'message': 'Timeout'}
+            return
+        finally:
+            if process.poll() is None:
+                # Klient se odpojil - stahování nenechat běžet bez dozoru
+                process.kill()
+            self.invalidate_cache()
+        
+        if returncode == 0:
+            yield {'phase': 'done', 'success': True, 'progress': 100, 'message': f"Image {image} stažen"}
+        else:
+            message = '\n'.join(output[-5:]) or "Chyba při stahování"
+            yield {'phase': 'done', 'success': False, 'message': message}
     
     def delete_image(self, image: str) -> Tuple[bool, str]:
         """Smaže lokální image"""
         result = self.run_command(['rmi', image])
+        self.invalidate_cache()
         if result['success']:
             return True, f"Image {image} smazán"
         return False, result['stderr'] or "Chyba při mazání"
     
-    def prune_unused_images(self) -> Tuple[bool, str]:
-        """Smaže nepoužívané images"""
-        # Získat všechny images
+    def prune_plan(self) -> Optional[Dict[str, Any]]:
+        """Rozdělí lokální images na nepoužívané (ke smazání) a používané (s kontejnery)
+        
+        Vrací None, pokud se nepodařilo načíst seznam kontejnerů - index se pak nesrovnává,
+        jinak by prázdný výpis smazal všechny reference a každý image by vypadal jako nepoužívaný.
+        """
+        if self.image_index is None:
+            raise RuntimeError("Index images není nastaven")
+        listing = self._read('list_containers', True)
+        if listing is None:
+            return None
         images = self.get_images()
         
-        # Získat všechny kontejnery
-        all_containers = self.get_all_containers()
+        # Jeden výpis ps -a dorovná změny provedené mimo manager; inspect jen u kontejnerů bez image
+        def resolve_image(entry: Dict[str, str]) -> str:
+            image = self.inspect_container(entry.get('name') or entry['id']).get('image')
+            return image if image != 'unknown' else None
+        unresolved = self.image_index.reconcile(listing, resolve_image)
+        
+        delete, keep = [], {}
+        for image in images:
+            users = self.image_index.containers_using(image['full_name'])
+            if users:
+                keep[image['full_name']] = sorted(users)
+            else:
+                delete.append(image['full_name'])
+        return {'delete': delete, 'keep': keep, 'unresolved': unresolved}
+    
+    def prune_unused_images(self, dry_run: bool = False, confirmed: List[str] = None,
+                            workers: int = 4) -> Tuple[bool, str, Dict[str, Any]]:
+        """Smaže nepoužívané images (dry_run = jen vrátí plán)
+        
+        confirmed = images schválené uživatelem podle dřívějšího dry run; smažou se jen ty,
+        které jsou v aktuálním plánu stále nepoužívané.
+        """
+        plan = self.prune_plan()
+        if plan is None:
+            return False, "Nepodařilo se načíst seznam kontejnerů, images nelze bezpečně posoudit", {}
+        if plan['unresolved']:
+            # Bez znalosti image těchto kontejnerů by se mohl smazat používaný image
+            return False, f"Nelze zjistit image kontejnerů: {', '.join(plan['unresolved'])}", plan
         
-        # Získat používané images z běžících kontejnerů
-        used_images = set()
-        for container in all_containers:
-            container_name = container.get('name', container.get('id'))
-            inspect_info = self.inspect_container(container_name)
-            if inspect_info and inspect_info.get('image') != 'unknown':
-                used_images.add(inspect_info['image'])
+        delete = plan['delete']
+        if confirmed is not None:
+            confirmed = set(confirmed)
+            plan['skipped'] = sorted(confirmed.difference(delete))
+            delete = [image for image in delete if image in confirmed]
+        if not delete:
+            return True, "Žádné nepoužívané images k smazání", plan
+        if dry_run:
+            return True, f"Ke smazání {len(delete)} nepoužívaných images: {', '.join(delete)}", plan
         
-        # Smazat nepoužívané images
-        deleted = 0
-        deleted_names = []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(delete)))) as pool:
+            results = list(pool.map(self.delete_image, delete))
+        deleted_names = [image for image, (success, _) in zip(delete, results) if success]
+        plan['deleted'] = deleted_names
+        plan['failed'] = {image: msg for image, (success, msg) in zip(delete, results) if not success}
         
-        for image in images:
-            image_name = image['full_name']
-            
-            # Zkontrolovat různé varianty názvu
-            is_used = False
-            for used in used_images:
-                if (image_name == used or 
-                    image_name in used or 
-                    used in image_name or
-                    image['repository'] in used):
-                    is_used = True
-                    break
-            
-            if not is_used:
-                success, msg = self.delete_image(image_name)
-                if success:
-                    deleted += 1
-                    deleted_names.append(image_name)
-        
-        if deleted > 0:
-            return True, f"Smazáno {deleted} nepoužívaných images: {', '.join(deleted_names[:3])}{'...' if len(deleted_names) > 3 else ''}"
-        else:
-            return True, "Žádné nepoužívané images k smazání"
\ No newline at end of file
+        if deleted_names:
+            return True, f"Smazáno {len(deleted_names)} nepoužívaných images: {', '.join(deleted_names[:3])}{'...' if len(deleted_names) > 3 else ''}", plan
+        return False, "Nepodařilo se smazat žádný image", plan
@@ -1,16 +1,110 @@
 """HTTP Routes pro Flask aplikaci"""
 
-from flask import render_template_string, request, jsonify, redirect, url_for
-from app import app, config_manager, udocker, container_manager
-from templates.html_template import HTML_TEMPLATE
-import time
+from flask import request, jsonify, redirect, url_for
+from app import app, config_manager, udocker, container_manager, pull_jobs, startup, state_events, page_renderer, assets
+from lib.assets import COMPRESSIBLE_TYPES, choose_encoding, compress, dynamic_encodings
+from werkzeug.http import quote_etag
 import json
+import time
 
 @app.route('/')
 def index():
-    all_containers = container_manager.get_all_containers_info()
-    images = udocker.get_images()
-    return render_template_string(HTML_TEMPLATE, containers=all_containers, images=images)
+    start = time.perf_counter()
+    all_containers, containers_etag = container_manager.containers_state()
+    images, images_etag = container_manager.images_state()
+    state_ms = (time.perf_counter() - start) * 1000
+    
+    context = {'containers_etag': quote_etag(containers_etag), 'images_etag': quote_etag(images_etag)}
+    app.update_template_context(context)
+    html, timing = page_renderer.render_index(all_containers, images, **context)
+    
+    response = app.response_class(html, mimetype='text/html')
+    response.headers['Server-Timing'] = (f"state;dur={state_ms:.2f}, compile;dur={timing['compile']:.2f}, "
+                                         f"render;dur={timing['render']:.2f}")
+    return response
+
+@app.route('/static/<name>', methods=['GET'])
+def static_asset(name):
+    """Statický soubor s hashem obsahu v názvu - předkomprimovaný, cachovatelný navždy"""
+    asset = assets.get(name)
+    if asset is None:
+        return jsonify({'success': False, 'message': 'Soubor nenalezen'}), 404
+    
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'), asset.variants)
+    response = app.response_class(asset.variants[encoding] if encoding else asset.data,
+                                  content_type=asset.mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Komprese HTML a JSON odpovědí (brotli, nebo gzip) podle Accept-Encoding"""
+    if (response.direct_passthrough or response.is_streamed or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'), dynamic_encodings())
+    # Malé odpovědi se komprimovat nevyplatí
+    if encoding is None or len(data) < 512:
+        return response
+    
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # Komprimovaná reprezentace se liší po bajtech - silný validátor by pro ni neplatil
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def _state_response(etag: str, build):
+    """JSON odpověď s ETag - při shodě If-None-Match vrátí 304 bez těla"""
+    if request.if_none_match.contains_weak(etag):
+        # Slabý validátor klient dostal s komprimovanou odpovědí - vrátit ho ve stejné podobě
+        response = app.response_class(status=304)
+        response.set_etag(etag, weak=not request.if_none_match.contains(etag))
+    else:
+        response = jsonify(build())
+        response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/containers', methods=['GET'])
+def api_containers():
+    """Stav všech kontejnerů (podmíněný GET přes ETag)"""
+    containers, etag = container_manager.containers_state()
+    return _state_response(etag, lambda: {
+        'containers': [{**c, 'key': container_id} for container_id, c in containers.items()]
+    })
+
+@app.route('/api/images', methods=['GET'])
+def api_images():
+    """Seznam images (podmíněný GET přes ETag)"""
+    images, etag = container_manager.images_state()
+    return _state_response(etag, lambda: {'images': images})
+
+@app.route('/events', methods=['GET'])
+def events():
+    """Server-sent events se změnami kontejnerů a images (jedna sdílená smyčka pro všechny klienty)"""
+    def generate():
+        for event in state_events.subscribe():
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            # ETagy ve stejném tvaru jako hlavička ETag z /api/*
+            payload = dict(event)
+            for key in ('containers_etag', 'images_etag'):
+                if key in payload:
+                    payload[key] = quote_etag(payload[key])
+            yield f"data: {json.dumps(payload)}\n\n"
+    
+    return app.response_class(generate(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/create', methods=['POST'])
 def create_container():
@@ -86,6 +180,28 @@ def delete_container(container_id):
     success, message = container_manager.delete_container(container_id)
     return jsonify({'success': success, 'message': message})
 
+@app.route('/bulk', methods=['POST'])
+def bulk():
+    """Dávka akcí nad kontejnery - výsledky se streamují po řádcích (NDJSON), jak doběhnou"""
+    payload = request.get_json(silent=True)
+    items = payload.get('items') if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return jsonify({'success': False, 'message': 'Očekávám seznam položek {action, container_id}'}), 400
+    workers = config_manager.get_setting('bulk_workers', 4)
+    
+    def generate():
+        start = time.perf_counter()
+        succeeded = 0
+        for result in container_manager.bulk(items, workers=workers):
+            succeeded += 1 if result['success'] else 0
+            yield json.dumps(result) + '\n'
+        yield json.dumps({'done': True, 'total': len(items), 'succeeded': succeeded,
+                          'failed': len(items) - succeeded,
+                          'elapsed': round(time.perf_counter() - start, 3)}) + '\n'
+    
+    return app.response_class(generate(), mimetype='application/x-ndjson',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/save/<container_id>', methods=['POST'])
 def save_container(container_id):
     success, message = container_manager.save_running_container(container_id)
@@ -94,36 +210,54 @@ def save_container(container_id):
 @app.route('/pull', methods=['POST'])
 def pull_image():
     image = request.form['image']
-    return jsonify({'image': image})
+    job = pull_jobs.submit(image)
+    return jsonify({'image': image, 'job': job.id})
 
 @app.route('/pull-progress/<path:image>', methods=['GET'])
 def pull_progress(image):
     """Server-sent events pro progress pull operace"""
+    # Připojit se k úloze ve frontě (souběžné požadavky na stejný image sdílí jedno stahování)
+    job = pull_jobs.submit(image)
+    
     def generate():
-        # OPRAVA: Použití json.dumps() pro správný JSON formát
-        yield f"data: {json.dumps({'progress': 10, 'message': 'Připojuji se k registru...'})}\n\n"
-        time.sleep(0.5)
-        
-        yield f"data: {json.dumps({'progress': 30, 'message': 'Stahuji metadata...'})}\n\n"
-        time.sleep(0.5)
-        
-        yield f"data: {json.dumps({'progress': 50, 'message': 'Stahuji vrstvy image...'})}\n\n"
-        
-        success, message = udocker.pull_image(image)
-        
-        if success:
-            yield f"data: {json.dumps({'progress': 90, 'message': 'Rozbaluji image...'})}\n\n"
-            time.sleep(0.3)
-            yield f"data: {json.dumps({'progress': 100, 'message': 'Hotovo!', 'success': True})}\n\n"
-        else:
-            yield f"data: {json.dumps({'error': message})}\n\n"
+        yield f"data: {json.dumps({'job': job.id, 'progress': max(job.progress, 1), 'message': job.message})}\n\n"
+        for event in job.follow():
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event['phase'] == 'done':
+                if event['success']:
+                    yield f"data: {json.dumps({'progress': 100, 'message': 'Hotovo!', 'success': True})}\n\n"
+                else:
+                    yield f"data: {json.dumps({'error': event['message']})}\n\n"
+            elif event['phase'] in ('start', 'progress'):
+                yield f"data: {json.dumps(event)}\n\n"
+            elif event['phase'] == 'layer':
+                yield f"data: {json.dumps({'message': event['message'], 'layer': event['layer']})}\n\n"
     
     return app.response_class(generate(), mimetype='text/event-stream')
 
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Seznam úloh stahování"""
+    return jsonify({'jobs': pull_jobs.list_jobs()})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Stav úlohy stahování"""
+    job = pull_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Úloha nenalezena'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
 @app.route('/prune-images', methods=['POST'])
 def prune_images():
-    success, message = udocker.prune_unused_images()
-    return jsonify({'success': success, 'message': message})
+    dry_run = request.form.get('dry_run') == '1'
+    # Mazat jen images, které uživatel potvrdil podle dry run
+    confirmed = None if dry_run else request.form.getlist('images')
+    if not dry_run and not confirmed:
+        return jsonify({'success': False, 'message': 'Chybí seznam potvrzených images'}), 400
+    success, message, plan = udocker.prune_unused_images(dry_run=dry_run, confirmed=confirmed)
+    return jsonify({'success': success, 'message': message, 'dry_run': dry_run, 'plan': plan})
 
 @app.route('/delete-image', methods=['POST'])
 def delete_image():
@@ -138,8 +272,57 @@ def get_logs(container_id):
     success, logs = udocker.get_container_logs(container_id, lines)
     return jsonify({'success': success, 'logs': logs})
 
+@app.route('/logs/<container_id>/follow', methods=['GET'])
+def follow_logs(container_id):
+    """Server-sent events s novými řádky logu kontejneru"""
+    lines = request.args.get('lines', 0, type=int)
+    
+    def generate():
+        if lines > 0:
+            success, logs = udocker.get_container_logs(container_id, lines)
+            if success and logs:
+                yield f"data: {json.dumps({'lines': logs.splitlines()})}\n\n"
+        
+        for batch in udocker.follow_container_logs(container_id):
+            if batch.get('dropped'):
+                yield f"data: {json.dumps({'error': 'Klient nestíhá, sledování ukončeno', 'lag': batch['lag']})}\n\n"
+                return
+            if batch.get('lines'):
+                yield f"data: {json.dumps({'lines': batch['lines']})}\n\n"
+            else:
+                yield ": keepalive\n\n"
+    
+    return app.response_class(generate(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/check-image/<path:image>', methods=['GET'])
 def check_image(image):
     """Kontrola, zda image existuje"""
     exists = udocker.image_exists(image)
-    return jsonify({'exists': exists})
\ No newline at end of file
+    return jsonify({'exists': exists})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Stav synchronizace a autostartu po startu (503, dokud neskončí)"""
+    status = startup.to_dict()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/processes', methods=['GET'])
+def processes():
+    """Stav procesů spuštěných kontejnerů"""
+    return jsonify({'processes': udocker.process_status()})
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Statistiky snapshot cache udockeru"""
+    return jsonify(udocker.cache_stats())
+
+@app.route('/asset-stats', methods=['GET'])
+def asset_stats():
+    """Velikosti statických souborů a jejich předkomprimovaných variant"""
+    return jsonify(assets.stats())
+
+@app.route('/render-stats', methods=['GET'])
+def render_stats():
+    """Statistiky vykreslování hlavní stránky (kompilace šablony, cache řádků)"""
+    return jsonify(page_renderer.stats())
@@ -0,0 +1,434 @@
+function switchTab(name) {
+    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+    event.target.classList.add('active');
+    document.getElementById(name).classList.add('active');
+}
+
+function showProgress(title, message) {
+    const modal = document.getElementById('progressModal');
+    document.getElementById('modalTitle').textContent = title;
+    document.getElementById('progressText').textContent = message;
+    document.getElementById('progressFill').style.width = '50%';
+    modal.classList.add('active');
+}
+
+function hideProgress() {
+    document.getElementById('progressModal').classList.remove('active');
+}
+
+// Verze stavu vykresleného serverem - další dotazy jsou podmíněné (304 = beze změny)
+const etags = {containers: document.body.dataset.containersEtag, images: document.body.dataset.imagesEtag};
+
+function esc(value) {
+    return String(value ?? '').replace(/[&<>"']/g, ch => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[ch]));
+}
+
+function jsArg(value) {
+    return esc(JSON.stringify(String(value)));
+}
+
+function containerRow(c) {
+    return `<div class="container-item ${c.running ? 'running' : ''} ${c.managed ? 'managed' : ''}">
+        <div class="container-info">
+            <h3>${esc(c.name)}</h3>
+            <p>📦 ${esc(c.image)} • 🆔 ${esc(c.key)}</p>
+            <div style="margin-top: 0.5rem;">
+                <span class="status ${c.running ? 'running' : 'stopped'}">${c.running ? 'Běží' : 'Zastaven'}</span>
+                <span class="status ${c.managed ? 'managed' : 'unmanaged'}">${c.managed ? 'Spravován' : 'Externí'}</span>
+                ${c.autostart ? '<span class="status running">🚀 Autostart</span>' : ''}
+            </div>
+        </div>
+        <div class="container-actions">
+            <button class="btn btn-success btn-sm" onclick="start(${jsArg(c.key)})">▶ Start</button>
+            <button class="btn btn-warning btn-sm" onclick="stop(${jsArg(c.key)})">⏸ Stop</button>
+            ${c.managed
+                ? `<button class="btn btn-info btn-sm" onclick="edit(${jsArg(c.key)})">✏️ Editovat</button>`
+                : `<button class="btn btn-info btn-sm" onclick="save(${jsArg(c.key)})">💾 Uložit</button>`}
+            <button class="btn btn-danger btn-sm" onclick="del(${jsArg(c.key)})">🗑 Smazat</button>
+        </div>
+    </div>`;
+}
+
+function imageRow(img) {
+    return `<div class="container-item">
+        <div class="container-info">
+            <h3>${esc(img.full_name)}</h3>
+            <p>📦 ${esc(img.repository)} • 🏷️ ${esc(img.tag)}</p>
+        </div>
+        <button class="btn btn-danger btn-sm" onclick="delImage(${jsArg(img.full_name)})">🗑 Smazat</button>
+    </div>`;
+}
+
+function renderRow(key, item, render) {
+    const tpl = document.createElement('template');
+    tpl.innerHTML = render(item).trim();
+    const row = tpl.content.firstElementChild;
+    row.dataset.key = key;
+    row.dataset.sig = JSON.stringify(item);
+    return row;
+}
+
+// Přepíše jen řádky, jejichž data se změnila; ostatní zůstanou v DOM beze změny
+function patchList(listId, emptyId, items, keyOf, render) {
+    const list = document.getElementById(listId);
+    const existing = new Map([...list.children].map(el => [el.dataset.key, el]));
+    let prev = null;
+    for (const item of items) {
+        const key = keyOf(item);
+        let el = existing.get(key);
+        existing.delete(key);
+        if (!el || el.dataset.sig !== JSON.stringify(item)) {
+            const fresh = renderRow(key, item, render);
+            if (el) el.replaceWith(fresh);
+            el = fresh;
+        }
+        const expected = prev ? prev.nextElementSibling : list.firstElementChild;
+        if (expected !== el) list.insertBefore(el, expected);
+        prev = el;
+    }
+    existing.forEach(el => el.remove());
+    document.getElementById(emptyId).style.display = items.length ? 'none' : '';
+}
+
+async function fetchState(kind) {
+    const headers = etags[kind] ? {'If-None-Match': etags[kind]} : {};
+    const res = await fetch(`/api/${kind}`, {headers: headers, cache: 'no-store'});
+    if (res.status === 304 || !res.ok) return null;
+    etags[kind] = res.headers.get('ETag');
+    return res.json();
+}
+
+async function refreshContainers() {
+    const data = await fetchState('containers');
+    if (data) patchList('containerList', 'containersEmpty', data.containers, c => c.key, containerRow);
+}
+
+async function refreshImages() {
+    const data = await fetchState('images');
+    if (data) patchList('imageList', 'imagesEmpty', data.images, img => img.full_name, imageRow);
+}
+
+function refreshAll() {
+    return Promise.all([refreshContainers(), refreshImages()]);
+}
+
+// Jedna změna ze /events - přidá, nahradí nebo odebere jediný řádek
+function patchRow(listId, emptyId, key, item, position, render) {
+    const list = document.getElementById(listId);
+    const el = [...list.children].find(row => row.dataset.key === key);
+    if (item === undefined) {
+        if (el) el.remove();
+    } else {
+        const fresh = renderRow(key, item, render);
+        if (el) el.replaceWith(fresh);
+        else list.insertBefore(fresh, list.children[position] || null);
+    }
+    document.getElementById(emptyId).style.display = list.children.length ? 'none' : '';
+}
+
+function applyEvent(ev) {
+    if (ev.type === 'resync') {
+        refreshAll();
+        return;
+    }
+    if (ev.type.startsWith('image_')) {
+        patchRow('imageList', 'imagesEmpty', ev.key, ev.image, ev.position, imageRow);
+    } else {
+        const c = ev.container && {...ev.container, key: ev.key};
+        patchRow('containerList', 'containersEmpty', ev.key, c, ev.position, containerRow);
+    }
+    etags.containers = ev.containers_etag;
+    etags.images = ev.images_etag;
+}
+
+const stateEvents = new EventSource('/events');
+stateEvents.onmessage = event => applyEvent(JSON.parse(event.data));
+// Po (znovu)připojení dohnat změny, které mohly proběhnout mezitím
+stateEvents.onopen = () => refreshAll();
+
+async function createContainer(e) {
+    e.preventDefault();
+    const form = e.target;
+    const formData = new FormData(form);
+
+    showProgress('Vytváření kontejneru', 'Kontroluji image...');
+
+    try {
+        // Nejprve zkontrolujeme, zda potřebujeme stáhnout image
+        const image = formData.get('image');
+        const checkRes = await fetch(`/check-image/${encodeURIComponent(image)}`);
+        const checkData = await checkRes.json();
+
+        if (!checkData.exists) {
+            // Potřebujeme stáhnout image
+            document.getElementById('progressText').textContent = 'Stahuji image...';
+
+            await new Promise((resolve, reject) => {
+                const eventSource = new EventSource(`/pull-progress/${encodeURIComponent(image)}`);
+
+                eventSource.onmessage = function(event) {
+                    try {
+                        const data = JSON.parse(event.data);
+
+                        if (data.error) {
+                            eventSource.close();
+                            reject(new Error(data.error));
+                            return;
+                        }
+
+                        if (data.progress) {
+                            document.getElementById('progressFill').style.width = data.progress + '%';
+                            document.getElementById('progressText').textContent = data.message || 'Stahuji...';
+                        } else if (data.message) {
+                            document.getElementById('progressText').textContent = data.message;
+                        }
+
+                        if (data.success) {
+                            eventSource.close();
+                            resolve();
+                        }
+                    } catch (err) {
+                        eventSource.close();
+                        reject(err);
+                    }
+                };
+
+                eventSource.onerror = function() {
+                    eventSource.close();
+                    reject(new Error('Chyba při stahování image'));
+                };
+            });
+        }
+
+        // Nyní vytvoříme kontejner
+        document.getElementById('progressText').textContent = 'Vytvářím kontejner...';
+        document.getElementById('progressFill').style.width = '70%';
+
+        const res = await fetch('/create', {
+            method: 'POST',
+            body: formData
+        });
+        const data = await res.json();
+
+        document.getElementById('progressFill').style.width = '100%';
+
+        hideProgress();
+
+        if (data.success) {
+            alert('✅ ' + data.message);
+            form.reset();
+            refreshAll();
+        } else {
+            alert('❌ ' + data.message);
+        }
+    } catch (err) {
+        hideProgress();
+        alert('❌ Chyba: ' + err.message);
+    }
+}
+
+async function pullImage(e) {
+    e.preventDefault();
+    const image = document.getElementById('pullImageInput').value;
+
+    showProgress('Stahuji image', `Připojuji se k registru...`);
+
+    try {
+        const eventSource = new EventSource(`/pull-progress/${encodeURIComponent(image)}`);
+
+        eventSource.onmessage = function(event) {
+            try {
+                const data = JSON.parse(event.data);
+
+                if (data.error) {
+                    eventSource.close();
+                    hideProgress();
+                    alert('❌ Chyba: ' + data.error);
+                    return;
+                }
+
+                if (data.progress) {
+                    document.getElementById('progressFill').style.width = data.progress + '%';
+                    document.getElementById('progressText').textContent = data.message || 'Stahuji...';
+                } else if (data.message) {
+                    document.getElementById('progressText').textContent = data.message;
+                }
+
+                if (data.success) {
+                    eventSource.close();
+                    hideProgress();
+                    alert('✅ Image úspěšně stažen!');
+                    refreshImages();
+                }
+            } catch (err) {
+                console.error('Parse error:', err);
+            }
+        };
+
+        eventSource.onerror = function() {
+            eventSource.close();
+            hideProgress();
+            alert('❌ Chyba při stahování');
+        };
+
+    } catch (err) {
+        hideProgress();
+        alert('❌ Chyba: ' + err.message);
+    }
+}
+
+async function start(id) {
+    const res = await fetch(`/start/${id}`, {method: 'POST'});
+    const data = await res.json();
+    alert((data.success ? '✅ ' : '❌ ') + data.message);
+    if (data.success) refreshContainers();
+}
+
+async function stop(id) {
+    const res = await fetch(`/stop/${id}`, {method: 'POST'});
+    const data = await res.json();
+    alert((data.success ? '✅ ' : '❌ ') + data.message);
+    if (data.success) refreshContainers();
+}
+
+async function del(id) {
+    if (confirm('🗑️ Opravdu smazat tento kontejner?')) {
+        const res = await fetch(`/delete/${id}`, {method: 'POST'});
+        const data = await res.json();
+        alert((data.success ? '✅ ' : '❌ ') + data.message);
+        if (data.success) refreshContainers();
+    }
+}
+
+async function save(id) {
+    const res = await fetch(`/save/${id}`, {method: 'POST'});
+    const data = await res.json();
+    alert((data.success ? '✅ ' : '❌ ') + data.message);
+    if (data.success) refreshContainers();
+}
+
+async function edit(id) {
+    try {
+        const res = await fetch(`/get-config/${id}`);
+        const data = await res.json();
+
+        if (data.success) {
+            document.getElementById('editContainerId').value = id;
+            document.getElementById('editName').value = data.config.name;
+            document.getElementById('editImage').value = data.config.image;
+            document.getElementById('editPorts').value = data.config.ports;
+            document.getElementById('editVolumes').value = data.config.volumes;
+            document.getElementById('editEnv').value = data.config.env;
+            document.getElementById('editCommand').value = data.config.command;
+            document.getElementById('editAutostart').checked = data.config.autostart;
+
+            document.getElementById('editModal').classList.add('active');
+        } else {
+            alert('❌ ' + data.message);
+        }
+    } catch (err) {
+        alert('❌ Chyba: ' + err.message);
+    }
+}
+
+function closeEditModal() {
+    document.getElementById('editModal').classList.remove('active');
+}
+
+async function updateContainer(e) {
+    e.preventDefault();
+
+    if (!confirm('⚠️ Starý kontejner bude smazán a nahrazen novým. Pokračovat?')) {
+        return;
+    }
+
+    const form = e.target;
+    const formData = new FormData(form);
+    const containerId = formData.get('container_id');
+
+    showProgress('Aktualizuji kontejner', 'Mažu starý kontejner a vytvářím nový...');
+
+    try {
+        const res = await fetch(`/update/${containerId}`, {
+            method: 'POST',
+            body: formData
+        });
+        const data = await res.json();
+
+        hideProgress();
+        closeEditModal();
+
+        if (data.success) {
+            alert('✅ ' + data.message);
+            refreshAll();
+        } else {
+            alert('❌ ' + data.message);
+        }
+    } catch (err) {
+        hideProgress();
+        alert('❌ Chyba: ' + err.message);
+    }
+}
+
+async function pruneImages() {
+    showProgress('Mazání images', 'Kontroluji nepoužívané images...');
+    const form = new FormData();
+    form.append('dry_run', '1');
+    const res = await fetch('/prune-images', {method: 'POST', body: form});
+    const data = await res.json();
+    hideProgress();
+    if (!data.success || !data.plan.delete.length) {
+        alert((data.success ? '✅ ' : '❌ ') + data.message);
+        return;
+    }
+    if (confirm('🗑️ Smazat nepoužívané images?\n\n' + data.plan.delete.join('\n'))) {
+        showProgress('Mazání images', `Mažu ${data.plan.delete.length} images...`);
+        const confirmed = new FormData();
+        data.plan.delete.forEach(image => confirmed.append('images', image));
+        const res = await fetch('/prune-images', {method: 'POST', body: confirmed});
+        const result = await res.json();
+        hideProgress();
+        alert((result.success ? '✅ ' : '❌ ') + result.message);
+        refreshImages();
+    }
+}
+
+// Dokud na pozadí běží synchronizace a autostart, zobrazovat jejich průběh
+async function pollStartup() {
+    const banner = document.getElementById('startupBanner');
+    try {
+        const res = await fetch('/ready');
+        const data = await res.json();
+        if (data.ready) {
+            if (banner.classList.contains('active')) {
+                banner.classList.remove('active');
+                refreshAll();
+            }
+            return;
+        }
+        const a = data.autostart;
+        banner.textContent = data.phase === 'autostart' && a
+            ? `⏳ Autostart kontejnerů: ${a.done}/${a.total}` + (a.failed ? ` (${a.failed} selhalo)` : '')
+            : '⏳ Synchronizace kontejnerů po startu...';
+        banner.classList.add('active');
+    } catch (err) {
+        // Server ještě neodpovídá - zkusit znovu
+    }
+    setTimeout(pollStartup, 1000);
+}
+pollStartup();
+
+async function delImage(name) {
+    if (confirm(`🗑️ Smazat image ${name}?`)) {
+        const res = await fetch('/delete-image', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/x-www-form-urlencoded'},
+            body: `image=${encodeURIComponent(name)}`
+        });
+        const data = await res.json();
+        alert((data.success ? '✅ ' : '❌ ') + data.message);
+        if (data.success) refreshImages();
+    }
+}
+